@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional, Mapping
 
@@ -19,6 +19,8 @@ from bot.finance.pipeline import (
 
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
 
 # ======================================================================
 # Config & dataclasses "vue finance"
@@ -197,7 +199,7 @@ class FinanceEngine:
           - compounding réel,
           - limites de transferts inter-wallets on-chain, etc.
         """
-        now = now or datetime.utcnow()
+        now = now or datetime.now(_UTC)
 
         # On se contente d'un debug pour l'instant pour éviter tout double-run.
         self._logger.debug(
@@ -215,7 +217,7 @@ class FinanceEngine:
 
         Utilisable directement par la couche Monitoring / UI.
         """
-        now = now or datetime.utcnow()
+        now = now or datetime.now(_UTC)
 
         configs: Dict[str, WalletConfig] = self._wallet_engine.configs
         states: Dict[str, WalletState] = self._wallet_engine.states
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone
 
 
@@ -15,8 +17,11 @@ FEES_UNDER_BUFFER = "FEES_UNDER_BUFFER"
 FEES_SAFE = "FEES_SAFE"
 FEES_OVER_CAP = "FEES_OVER_CAP"
 
+# Zones remontées comme raison de blocage par le LIVE gate
+_BAD_FEES_ZONES = frozenset((FEES_UNDER_HARD_BUFFER, FEES_UNDER_BUFFER, FEES_OVER_CAP))
 
-@dataclass
+
+@dataclass(slots=True)
 class FeesState:
     wallet_id: str
     balance_usd: float
@@ -37,16 +42,45 @@ class FeesState:
     last_sweep_at: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Dict explicite (asdict fait une copie récursive générique) ;
+        # violations est copiée comme le faisait asdict.
+        return {
+            "wallet_id": self.wallet_id,
+            "balance_usd": self.balance_usd,
+            "hard_buffer_usd": self.hard_buffer_usd,
+            "soft_buffer_usd": self.soft_buffer_usd,
+            "dynamic_cap_usd": self.dynamic_cap_usd,
+            "zone": self.zone,
+            "violations": list(self.violations),
+            "target_pct": self.target_pct,
+            "target_fees_usd": self.target_fees_usd,
+            "surplus_usd": self.surplus_usd,
+            "would_sweep": self.would_sweep,
+            "sweep_min_usd": self.sweep_min_usd,
+            "profits_share_pct": self.profits_share_pct,
+            "vault_share_pct": self.vault_share_pct,
+            "cooldown_minutes": self.cooldown_minutes,
+            "last_sweep_at": self.last_sweep_at,
+        }
+
+
+_D0 = Decimal(0)
 
 
 def _to_decimal(x: Any, default: str = "0") -> Decimal:
     if x is None:
-        return Decimal(default)
+        return _D0 if default == "0" else Decimal(default)
+    # Fast paths (type exact : bool reste sur le chemin str -> default)
+    t = type(x)
+    if t is Decimal:
+        return x
+    if t is int:
+        return Decimal(x)
+    # float : on garde str() (repr court, ex. 0.1 -> Decimal("0.1"))
     try:
         return Decimal(str(x))
     except Exception:
-        return Decimal(default)
+        return _D0 if default == "0" else Decimal(default)
 
 
 def _parse_datetime_utc(value: Any) -> Optional[datetime]:
@@ -66,22 +100,34 @@ def _parse_datetime_utc(value: Any) -> Optional[datetime]:
             return value.replace(tzinfo=timezone.utc)
         return value.astimezone(timezone.utc)
 
-    try:
-        txt = str(value).strip()
-        if not txt:
-            return None
+    txt = value if isinstance(value, str) else str(value)
+    return _parse_iso_str(txt)
+
+
+# fromisoformat accepte le suffixe 'Z' nativement depuis Python 3.11
+_ISO_Z_NATIVE = sys.version_info >= (3, 11)
 
-        # Gestion simple du suffixe 'Z'
-        if txt.endswith("Z"):
-            txt = txt[:-1] + "+00:00"
 
+@lru_cache(maxsize=1024)
+def _parse_iso_str(txt: str) -> Optional[datetime]:
+    """
+    Parse une str ISO en datetime UTC (mis en cache : les mêmes timestamps,
+    ex. last_sweep_at, reviennent à chaque tick).
+    """
+    txt = txt.strip()
+    if not txt:
+        return None
+
+    # Gestion simple du suffixe 'Z' (Python < 3.11)
+    if not _ISO_Z_NATIVE and txt.endswith("Z"):
+        txt = txt[:-1] + "+00:00"
+
+    try:
         dt = datetime.fromisoformat(txt)
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        else:
-            dt = dt.astimezone(timezone.utc)
-        return dt
-    except Exception:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except (ValueError, OverflowError):
         return None
 
 
@@ -202,20 +248,21 @@ def compute_fees_state(
         except Exception:
             cooldown_int = 0
 
+    # Parsé une seule fois : sert au cooldown et à la sortie ISO
+    parsed_last = _parse_datetime_utc(last_sweep_at)
+
     if sweep_min_dec > 0 and surplus >= sweep_min_dec:
         # Respect du cooldown si fourni
-        last_dt = _parse_datetime_utc(last_sweep_at)
-        if last_dt is None or cooldown_int <= 0:
+        if parsed_last is None or cooldown_int <= 0:
             would_sweep = True
         else:
             now = _now_utc()
-            elapsed_min = (now - last_dt).total_seconds() / 60.0
+            elapsed_min = (now - parsed_last).total_seconds() / 60.0
             if elapsed_min >= cooldown_int:
                 would_sweep = True
 
     # On stocke last_sweep_at sous forme de str ISO UTC si possible
     last_sweep_iso: Optional[str]
-    parsed_last = _parse_datetime_utc(last_sweep_at)
     if parsed_last is None:
         last_sweep_iso = None
     else:
@@ -283,51 +330,31 @@ def compute_live_gate(
         "hard_stop_active": ...,
       }
     """
+    return compute_live_gate_batch(
+        safety_cfg=safety_cfg,
+        snapshots=[(finance_snapshot, execution_runtime)],
+        force_locked=force_locked,
+    )[0]
 
-    reasons: List[str] = []
-    checks: Dict[str, Any] = {}
-
-    # --------------------------------------------------------
-    # PRÉ-LIVE : verrou global
-    # --------------------------------------------------------
-    reasons.append("M10_NOT_VALIDATED")
-    reasons.append("PAPER_ONLY_MODE")
 
+def compute_live_gate_batch(
+    *,
+    safety_cfg: Dict[str, Any],
+    snapshots: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+    force_locked: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Variante batch de compute_live_gate : safety_cfg n'est parsé qu'une fois
+    pour une série de paires (finance_snapshot, execution_runtime).
+    Retourne un résultat par paire, dans l'ordre.
+    """
     # --------------------------------------------------------
-    # Capital minimal
+    # Seuils safety_cfg (parsés une seule fois pour le batch)
     # --------------------------------------------------------
     min_capital = _to_decimal(safety_cfg.get("min_operational_capital_usd", 0))
-    equity_total = _to_decimal(finance_snapshot.get("equity_total_usd", 0))
-
-    checks["equity_total_usd"] = float(equity_total)
-    checks["min_operational_capital_usd"] = float(min_capital)
-
-    if equity_total < min_capital:
-        reasons.append("CAPITAL_BELOW_MIN_OPERATIONAL")
-
-    # --------------------------------------------------------
-    # Drawdown du jour
-    # --------------------------------------------------------
+    min_capital_f = float(min_capital)
     critical_dd = _to_decimal(safety_cfg.get("critical_drawdown_pct", 100))
-    dd_pct = _to_decimal(execution_runtime.get("daily_drawdown_pct", 0))
-
-    checks["daily_drawdown_pct"] = float(dd_pct)
-    checks["critical_drawdown_pct"] = float(critical_dd)
-
-    if critical_dd > 0 and dd_pct >= critical_dd:
-        reasons.append("DAILY_DRAWDOWN_ABOVE_CRITICAL")
-
-    # --------------------------------------------------------
-    # Streak de pertes
-    # --------------------------------------------------------
-    streak = execution_runtime.get("consecutive_losers")
-    if streak is None:
-        streak = execution_runtime.get("losing_streak", 0)
-
-    try:
-        streak = int(streak or 0)
-    except Exception:
-        streak = 0
+    critical_dd_f = float(critical_dd)
 
     streak_crit_raw = safety_cfg.get("max_consecutive_losers_critical")
     try:
@@ -335,104 +362,143 @@ def compute_live_gate(
     except Exception:
         streak_crit = None
 
-    checks["consecutive_losers"] = streak
-    checks["max_consecutive_losers_critical"] = streak_crit
-
-    if streak_crit is not None and streak >= streak_crit:
-        reasons.append("CONSECUTIVE_LOSERS_ABOVE_CRITICAL")
-
-    # --------------------------------------------------------
-    # Kill switch / hard stop
-    # --------------------------------------------------------
-    ks_raw = execution_runtime.get("kill_switch")
-
-    # Deux formats possibles :
-    # - bool simple
-    # - dict { enabled: bool, tripped: bool, reason: str | None }
-    if isinstance(ks_raw, dict):
-        ks_tripped = bool(ks_raw.get("tripped"))
-    else:
-        ks_tripped = bool(ks_raw)
-
-    kill_switch = bool(
-        ks_tripped
-        or execution_runtime.get("hard_stop_active")
-        or execution_runtime.get("kill_switch_tripped")
-    )
-    checks["kill_switch"] = kill_switch
+    results: List[Dict[str, Any]] = []
+    for finance_snapshot, execution_runtime in snapshots:
+        reasons: List[str] = []
+        checks: Dict[str, Any] = {}
 
-    if kill_switch:
-        reasons.append("KILL_SWITCH_ACTIVE")
+        # --------------------------------------------------------
+        # PRÉ-LIVE : verrou global
+        # --------------------------------------------------------
+        reasons.append("M10_NOT_VALIDATED")
+        reasons.append("PAPER_ONLY_MODE")
 
-    # --------------------------------------------------------
-    # Zone FEES (fees_state)
-    # --------------------------------------------------------
-    fees_state = finance_snapshot.get("fees_state") or {}
-    fees_zone = fees_state.get("zone")
+        # --------------------------------------------------------
+        # Capital minimal
+        # --------------------------------------------------------
+        equity_total = _to_decimal(finance_snapshot.get("equity_total_usd", 0))
 
-    checks["fees_zone"] = fees_zone
+        checks["equity_total_usd"] = float(equity_total)
+        checks["min_operational_capital_usd"] = min_capital_f
 
-    if fees_zone in {
-        FEES_UNDER_HARD_BUFFER,
-        FEES_UNDER_BUFFER,
-        FEES_OVER_CAP,
-    }:
-        # On remonte directement le code de zone comme raison
-        reasons.append(str(fees_zone))
+        if equity_total < min_capital:
+            reasons.append("CAPITAL_BELOW_MIN_OPERATIONAL")
 
-    # --------------------------------------------------------
-    # Risk wallets (caps en % d'equity)
-    # --------------------------------------------------------
-    risk_wallets = finance_snapshot.get("risk_wallets") or []
-    over_cap_ids: List[str] = []
+        # --------------------------------------------------------
+        # Drawdown du jour
+        # --------------------------------------------------------
+        dd_pct = _to_decimal(execution_runtime.get("daily_drawdown_pct", 0))
 
-    if isinstance(risk_wallets, list):
-        for rw in risk_wallets:
-            try:
-                over = bool(rw.get("over_cap"))
-            except Exception:
-                over = False
-            if over:
-                wid = str(rw.get("wallet_id") or "?")
-                over_cap_ids.append(wid)
+        checks["daily_drawdown_pct"] = float(dd_pct)
+        checks["critical_drawdown_pct"] = critical_dd_f
 
-    checks["risk_wallets_over_cap"] = over_cap_ids
+        if critical_dd > 0 and dd_pct >= critical_dd:
+            reasons.append("DAILY_DRAWDOWN_ABOVE_CRITICAL")
 
-    if over_cap_ids:
-        reasons.append("RISK_WALLET_OVER_CAP")
+        # --------------------------------------------------------
+        # Streak de pertes
+        # --------------------------------------------------------
+        streak = execution_runtime.get("consecutive_losers")
+        if streak is None:
+            streak = execution_runtime.get("losing_streak", 0)
 
-    # --------------------------------------------------------
-    # Alerte finance CRITICAL globale éventuelle
-    # --------------------------------------------------------
-    alerts = finance_snapshot.get("alerts") or {}
-    critical_alerts = alerts.get("critical") or []
+        try:
+            streak = int(streak or 0)
+        except Exception:
+            streak = 0
 
-    critical_codes: List[str] = []
-    if isinstance(critical_alerts, list):
-        critical_codes = [str(x) for x in critical_alerts]
-    elif isinstance(critical_alerts, dict):
-        for v in critical_alerts.values():
-            if isinstance(v, list):
-                critical_codes.extend(str(x) for x in v)
-    elif isinstance(critical_alerts, str):
-        critical_codes = [critical_alerts]
+        checks["consecutive_losers"] = streak
+        checks["max_consecutive_losers_critical"] = streak_crit
 
-    checks["finance_critical_alerts"] = critical_codes
+        if streak_crit is not None and streak >= streak_crit:
+            reasons.append("CONSECUTIVE_LOSERS_ABOVE_CRITICAL")
 
-    if critical_codes:
-        reasons.append("FINANCE_ALERTS_CRITICAL")
+        # --------------------------------------------------------
+        # Kill switch / hard stop
+        # --------------------------------------------------------
+        ks_raw = execution_runtime.get("kill_switch")
 
-    # --------------------------------------------------------
-    # allowed / blocked
-    # --------------------------------------------------------
-    if force_locked:
-        allowed = False
-    else:
-        allowed = len(reasons) == 0
+        # Deux formats possibles :
+        # - bool simple
+        # - dict { enabled: bool, tripped: bool, reason: str | None }
+        if isinstance(ks_raw, dict):
+            ks_tripped = bool(ks_raw.get("tripped"))
+        else:
+            ks_tripped = bool(ks_raw)
+
+        kill_switch = bool(
+            ks_tripped
+            or execution_runtime.get("hard_stop_active")
+            or execution_runtime.get("kill_switch_tripped")
+        )
+        checks["kill_switch"] = kill_switch
+
+        if kill_switch:
+            reasons.append("KILL_SWITCH_ACTIVE")
+
+        # --------------------------------------------------------
+        # Zone FEES (fees_state)
+        # --------------------------------------------------------
+        fees_state = finance_snapshot.get("fees_state") or {}
+        fees_zone = fees_state.get("zone")
+
+        checks["fees_zone"] = fees_zone
+
+        if fees_zone in _BAD_FEES_ZONES:
+            # On remonte directement le code de zone comme raison
+            reasons.append(str(fees_zone))
+
+        # --------------------------------------------------------
+        # Risk wallets (caps en % d'equity)
+        # --------------------------------------------------------
+        risk_wallets = finance_snapshot.get("risk_wallets") or []
+        over_cap_ids: List[str] = []
+
+        if isinstance(risk_wallets, list):
+            for rw in risk_wallets:
+                # Entrées non-dict ignorées (pas de try/except par wallet)
+                if isinstance(rw, dict) and rw.get("over_cap"):
+                    wid = str(rw.get("wallet_id") or "?")
+                    over_cap_ids.append(wid)
+
+        checks["risk_wallets_over_cap"] = over_cap_ids
+
+        if over_cap_ids:
+            reasons.append("RISK_WALLET_OVER_CAP")
+
+        # --------------------------------------------------------
+        # Alerte finance CRITICAL globale éventuelle
+        # --------------------------------------------------------
+        alerts = finance_snapshot.get("alerts") or {}
+        critical_alerts = alerts.get("critical") or []
+
+        critical_codes: List[str] = []
+        if isinstance(critical_alerts, list):
+            critical_codes = [str(x) for x in critical_alerts]
+        elif isinstance(critical_alerts, dict):
+            for v in critical_alerts.values():
+                if isinstance(v, list):
+                    critical_codes.extend(str(x) for x in v)
+        elif isinstance(critical_alerts, str):
+            critical_codes = [critical_alerts]
+
+        checks["finance_critical_alerts"] = critical_codes
+
+        if critical_codes:
+            reasons.append("FINANCE_ALERTS_CRITICAL")
+
+        # --------------------------------------------------------
+        # allowed / blocked
+        # --------------------------------------------------------
+        if force_locked:
+            allowed = False
+        else:
+            allowed = len(reasons) == 0
 
-    return {
-        "allowed": allowed,
-        "reasons": reasons,
-        "checks": checks,
-    }
+        results.append({
+            "allowed": allowed,
+            "reasons": reasons,
+            "checks": checks,
+        })
 
+    return results
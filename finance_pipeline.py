@@ -3,14 +3,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from decimal import Decimal, getcontext
+from decimal import Decimal
 from typing import Any, Dict, List, Optional, Mapping
 
 from bot.core.logging import get_logger
 
-getcontext().prec = 50
 logger = get_logger(__name__)
 
+# Cache des Decimal parsés depuis la config : les mêmes valeurs par défaut
+# ("0", "0.5", "50"...) reviennent pour chaque section / wallet.
+_DEC_CACHE: Dict[str, Decimal] = {}
+_DEC_CACHE_MAX = 1024
+
+
+def _D(x: Any) -> Decimal:
+    """Decimal(str(x)) mémoïsé (Decimal est immuable, partage sans risque)."""
+    s = x if isinstance(x, str) else str(x)
+    d = _DEC_CACHE.get(s)
+    if d is None:
+        d = Decimal(s)
+        if len(_DEC_CACHE) < _DEC_CACHE_MAX:
+            _DEC_CACHE[s] = d
+    return d
+
 
 # ======================================================================
 # Dataclasses de base (snapshots & plans)
@@ -80,7 +95,7 @@ class AutoFeesConfig:
             out: Dict[str, Decimal] = {}
             for k, v in m.items():
                 try:
-                    out[str(k)] = Decimal(str(v))
+                    out[str(k)] = _D(v)
                 except Exception:
                     continue
             return out
@@ -102,11 +117,11 @@ class SweepConfig:
     def from_dict(d: Mapping[str, Any]) -> SweepConfig:
         enabled = bool(d.get("enabled", True))
         try:
-            min_profit_usd = Decimal(str(d.get("min_profit_usd", "50")))
+            min_profit_usd = _D(d.get("min_profit_usd", "50"))
         except Exception:
             min_profit_usd = Decimal("50")
         try:
-            sweep_pct = Decimal(str(d.get("sweep_pct", "0.5")))
+            sweep_pct = _D(d.get("sweep_pct", "0.5"))
         except Exception:
             sweep_pct = Decimal("0.5")
         return SweepConfig(
@@ -132,7 +147,7 @@ class CompoundingConfig:
 
         # pct à prélever sur la partie "excess" du vault
         try:
-            compound_pct = Decimal(str(d.get("compound_pct_from_vault", "0.3")))
+            compound_pct = _D(d.get("compound_pct_from_vault", "0.3"))
         except Exception:
             compound_pct = Decimal("0.3")
 
@@ -143,7 +158,7 @@ class CompoundingConfig:
 
         for name, raw in weights_raw.items():
             try:
-                w = Decimal(str(raw))
+                w = _D(raw)
             except Exception:
                 logger.warning(
                     "CompoundingConfig: poids invalide '%s' pour '%s', ignoré.",
@@ -163,7 +178,7 @@ class CompoundingConfig:
 
         # seuil mini du vault avant tout compounding
         try:
-            vault_min_balance_usd = Decimal(str(d.get("vault_min_balance_usd", "0")))
+            vault_min_balance_usd = _D(d.get("vault_min_balance_usd", "0"))
         except Exception:
             vault_min_balance_usd = Decimal("0")
 
@@ -174,7 +189,7 @@ class CompoundingConfig:
             max_compound_usd_per_run = None
         else:
             try:
-                max_compound_usd_per_run = Decimal(str(max_compound_usd_per_run_raw))
+                max_compound_usd_per_run = _D(max_compound_usd_per_run_raw)
             except Exception:
                 max_compound_usd_per_run = None
 
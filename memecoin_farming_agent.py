@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(frozen=True)
 class MemecoinPairConfig:
     """
     Config pour un "pair" memecoin surveillé.
@@ -28,6 +28,9 @@ class MemecoinPairConfig:
       - min_liquidity_usd, min_volume_24h_usd : filtres de qualité,
       - max_token_age_minutes : évite les trop vieux,
       - min_score : score minimal issu du provider.
+
+    Immuable : construite une fois au démarrage, le moteur peut donc
+    spécialiser ses filtres dessus sans risque de désynchronisation.
     """
     symbol: str
     chain: str
@@ -192,6 +195,10 @@ class MemecoinStrategyEngine:
         self._pair_cfg_by_symbol: Dict[str, MemecoinPairConfig] = {
             cfg.symbol: cfg for cfg in pair_configs
         }
+        # Liste figée (configs immuables) passée au provider à chaque tick
+        self._pair_cfg_list: List[MemecoinPairConfig] = list(
+            self._pair_cfg_by_symbol.values()
+        )
         self._pending_candidates: List[MemecoinCandidate] = []
         self._strategy_id = strategy_id
         self._exit_after_ticks = max(int(exit_after_ticks), 1)
@@ -231,9 +238,7 @@ class MemecoinStrategyEngine:
 
         try:
             new_candidates = list(
-                self._provider.scan_candidates(
-                    list(self._pair_cfg_by_symbol.values())
-                )
+                self._provider.scan_candidates(self._pair_cfg_list)
             )
         except Exception:
             self._logger.exception(
@@ -286,40 +291,42 @@ class MemecoinStrategyEngine:
             )
             return None
 
-        # Métriques supplémentaires du provider (optionnelles)
-        liq_usd = Decimal(str(candidate.meta.get("liq_usd", "0")))
-        vol_24h_usd = Decimal(str(candidate.meta.get("volume_24h_usd", "0")))
-        token_age_minutes = int(candidate.meta.get("token_age_minutes", 0))
+        # Métriques supplémentaires du provider (optionnelles) : on ne les
+        # parse que si le filtre correspondant est actif pour cette pair.
+        cand_meta = candidate.meta
 
-        if cfg.min_liquidity_usd > 0 and liq_usd < cfg.min_liquidity_usd:
-            self._logger.debug(
-                "Candidat %s ignoré (liq=%.2f < min_liquidity=%.2f)",
-                candidate.symbol,
-                float(liq_usd),
-                float(cfg.min_liquidity_usd),
-            )
-            return None
+        if cfg.min_liquidity_usd > 0:
+            liq_usd = Decimal(str(cand_meta.get("liq_usd", "0")))
+            if liq_usd < cfg.min_liquidity_usd:
+                self._logger.debug(
+                    "Candidat %s ignoré (liq=%.2f < min_liquidity=%.2f)",
+                    candidate.symbol,
+                    float(liq_usd),
+                    float(cfg.min_liquidity_usd),
+                )
+                return None
 
-        if cfg.min_volume_24h_usd > 0 and vol_24h_usd < cfg.min_volume_24h_usd:
-            self._logger.debug(
-                "Candidat %s ignoré (vol24h=%.2f < min_volume_24h=%.2f)",
-                candidate.symbol,
-                float(vol_24h_usd),
-                float(cfg.min_volume_24h_usd),
-            )
-            return None
+        if cfg.min_volume_24h_usd > 0:
+            vol_24h_usd = Decimal(str(cand_meta.get("volume_24h_usd", "0")))
+            if vol_24h_usd < cfg.min_volume_24h_usd:
+                self._logger.debug(
+                    "Candidat %s ignoré (vol24h=%.2f < min_volume_24h=%.2f)",
+                    candidate.symbol,
+                    float(vol_24h_usd),
+                    float(cfg.min_volume_24h_usd),
+                )
+                return None
 
-        if (
-            cfg.max_token_age_minutes > 0
-            and token_age_minutes > cfg.max_token_age_minutes
-        ):
-            self._logger.debug(
-                "Candidat %s ignoré (age=%d min > max_token_age=%d)",
-                candidate.symbol,
-                token_age_minutes,
-                cfg.max_token_age_minutes,
-            )
-            return None
+        if cfg.max_token_age_minutes > 0:
+            token_age_minutes = int(cand_meta.get("token_age_minutes", 0))
+            if token_age_minutes > cfg.max_token_age_minutes:
+                self._logger.debug(
+                    "Candidat %s ignoré (age=%d min > max_token_age=%d)",
+                    candidate.symbol,
+                    token_age_minutes,
+                    cfg.max_token_age_minutes,
+                )
+                return None
 
         # Clamp notionnel (reste en Decimal)
         notional = candidate.notional_usd
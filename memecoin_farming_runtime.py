@@ -424,6 +424,32 @@ class MemecoinRuntime:
                 "Erreur fatale dans MemecoinRuntime.run_forever()."
             )
             raise
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Fin de run : applique le PnL encore en file dans l'ExecutionEngine,
+        puis écrit l'état wallets en attente (le snapshot
+        wallets_runtime.json est debouncé entre deux ticks).
+        """
+        # trades paper encore bufferisés (écritures JSONL groupées)
+        inner = getattr(self.execution_engine, "inner_engine", None)
+        if hasattr(inner, "close"):
+            try:
+                inner.close()  # type: ignore[union-attr]
+            except Exception:
+                self.log.exception("Erreur dans inner_engine.close()")
+        if hasattr(self.execution_engine, "close"):
+            try:
+                self.execution_engine.close()  # type: ignore[call-arg]
+            except Exception:
+                self.log.exception("Erreur dans execution_engine.close()")
+        if hasattr(self.wallet_manager, "flush"):
+            try:
+                self.wallet_manager.flush()  # type: ignore[call-arg]
+            except Exception:
+                self.log.exception("Erreur dans wallet_manager.flush()")
 
 
 # ---------------------------------------------------------------------------
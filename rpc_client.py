@@ -6,11 +6,24 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, List
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple
 from urllib.error import URLError, HTTPError
 from urllib.request import Request, urlopen
 
+try:  # encodeur / décodeur JSON en C, optionnel
+    import orjson
+except ImportError:  # pragma: no cover - fallback stdlib
+    orjson = None  # type: ignore[assignment]
+
+try:  # pool HTTP keep-alive, optionnel
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # pragma: no cover - fallback urllib (une connexion par appel)
+    requests = None  # type: ignore[assignment]
+
 try:
     # Logger projet
     from bot.core.logging import get_logger
@@ -74,6 +87,113 @@ def _resolve_env(value: Any) -> Optional[str]:
     return resolved
 
 
+# ======================================================================
+# Transport HTTP
+# ======================================================================
+
+# Session partagée : les connexions TCP/TLS sont réutilisées entre appels
+# (healthchecks, polls de blocks) au lieu d'un handshake par requête.
+if requests is not None:
+    _SESSION = requests.Session()
+    _ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+    _SESSION.mount("https://", _ADAPTER)
+    _SESSION.mount("http://", _ADAPTER)
+    _HTTP_ERRORS: tuple = (URLError, HTTPError, requests.RequestException)
+    # statut HTTP d'erreur : l'endpoint a répondu (≠ timeout / connexion)
+    _HTTP_STATUS_ERRORS: tuple = (HTTPError, requests.HTTPError)
+else:  # pragma: no cover - fallback urllib
+    _SESSION = None
+    _HTTP_ERRORS = (URLError, HTTPError)
+    _HTTP_STATUS_ERRORS = (HTTPError,)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+if orjson is not None:
+    _dumps_bytes = orjson.dumps
+    _loads = orjson.loads
+else:  # pragma: no cover - fallback stdlib
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
+
+@lru_cache(maxsize=64)
+def _encoded_call(method: str) -> bytes:
+    """
+    Corps JSON-RPC encodé d'un appel sans paramètres (eth_blockNumber,
+    getSlot...) : identique d'un appel à l'autre, donc encodé une seule fois.
+    """
+    return _dumps_bytes({"jsonrpc": "2.0", "id": 1, "method": method, "params": []})
+
+
+def _post_json(url: str, data: bytes, timeout: float) -> bytes:
+    """
+    POST d'un corps JSON déjà encodé, retourne le corps brut de la réponse.
+
+    Lève une exception de `_HTTP_ERRORS` en cas d'erreur réseau / statut HTTP.
+    """
+    if _SESSION is not None:
+        resp = _SESSION.post(url, data=data, headers=_JSON_HEADERS, timeout=timeout)
+        resp.raise_for_status()
+        return resp.content
+
+    req = Request(url, data=data, headers=_JSON_HEADERS)
+    with urlopen(req, timeout=timeout) as resp:
+        return resp.read()
+
+
+def _rpc_batch(
+    url: str,
+    calls: List[Tuple[str, List[Any]]],
+    *,
+    timeout: float = 5.0,
+) -> Optional[List[Any]]:
+    """
+    Appel JSON-RPC en mode batch (`[{...}, {...}]`) : N appels, 1 aller-retour.
+
+    Retourne la liste des `result` dans l'ordre de `calls` (None pour une
+    entrée en erreur). Erreur réseau / timeout : tout à None, sans retenter
+    appel par appel (chaque essai coûterait à nouveau le timeout). Retourne
+    None si l'endpoint a répondu sans gérer les batchs (statut HTTP d'erreur,
+    réponse non-liste) — l'appelant retombe alors sur des appels unitaires.
+    """
+    body = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    try:
+        payload = _loads(_post_json(url, _dumps_bytes(body), timeout))
+    except _HTTP_STATUS_ERRORS as e:
+        logger.debug("rpc_batch %s: erreur HTTP (%s), fallback unitaire", url, e)
+        return None
+    except _HTTP_ERRORS as e:
+        logger.warning(
+            "rpc_batch %s: endpoint injoignable (%s)",
+            url,
+            e,
+            extra={"event": "rpc_error", "rpc_url": url},
+        )
+        return [None] * len(calls)
+    except Exception:
+        logger.debug("rpc_batch %s: réponse invalide, fallback unitaire", url, exc_info=True)
+        return None
+
+    if not isinstance(payload, list):
+        # Endpoint sans support batch (réponse d'erreur unique)
+        return None
+
+    results: List[Any] = [None] * len(calls)
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("id")
+        if isinstance(idx, int) and 0 <= idx < len(calls):
+            results[idx] = item.get("result")
+    return results
+
+
 # ======================================================================
 # RPCClient bas niveau
 # ======================================================================
@@ -110,27 +230,22 @@ class RPCClient:
 
         Retourne payload["result"] ou None en cas d'erreur.
         """
-        if params is None:
-            params = []
-
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-            "params": params,
-        }
-        data = json.dumps(payload).encode("utf-8")
-
-        req = Request(
-            self.rpc_url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
+        if params is None or params == []:
+            # Cas des polls / healthchecks : corps pré-encodé, aucune allocation
+            # (les params nommés vides `{}` restent envoyés tels quels)
+            data = _encoded_call(method)
+        else:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": method,
+                "params": params,
+            }
+            data = _dumps_bytes(payload)
 
         try:
-            with urlopen(req, timeout=timeout) as resp:
-                raw = resp.read().decode("utf-8", errors="replace")
-        except (URLError, HTTPError) as e:
+            raw = _post_json(self.rpc_url, data, timeout)
+        except _HTTP_ERRORS as e:
             logger.warning(
                 "RPCClient %s: erreur lors de l'appel %s (%s)",
                 self.name,
@@ -150,7 +265,7 @@ class RPCClient:
             return None
 
         try:
-            payload = json.loads(raw)
+            payload = _loads(raw)
         except Exception:  # pragma: no cover - réponse non JSON
             logger.warning(
                 "RPCClient %s: réponse non JSON pour %s",
@@ -174,27 +289,96 @@ class RPCClient:
 
         Retourne un int (numéro de block / slot) ou None en cas d'erreur.
         """
+        method = self._latest_block_method()
+        if method is None:
+            # Autres types : pas d'implémentation pour l'instant
+            return None
+        return self._parse_latest_block(self._rpc_call(method, []))
+
+    def _latest_block_method(self) -> Optional[str]:
+        if self.chain_type == "evm":
+            return "eth_blockNumber"
+        if self.chain_type == "solana":
+            # QuickNode / Solana standard supportent getSlot ou getBlockHeight.
+            return "getSlot"
+        return None
+
+    def _parse_latest_block(self, result: Any) -> Optional[int]:
         if self.chain_type == "evm":
-            result = self._rpc_call("eth_blockNumber", [])
-            if isinstance(result, str) and result.startswith("0x"):
+            # int(x, 16) accepte déjà le préfixe "0x" : pas de startswith()
+            if isinstance(result, str):
                 try:
                     return int(result, 16)
                 except ValueError:
                     return None
             return None
 
-        if self.chain_type == "solana":
-            # QuickNode / Solana standard supportent getSlot ou getBlockHeight.
-            result = self._rpc_call("getSlot", [])
-            if isinstance(result, int):
-                return result
-            try:
-                return int(result)
-            except (TypeError, ValueError):
-                return None
-
-        # Autres types : pas d'implémentation pour l'instant
-        return None
+        if isinstance(result, int):
+            return result
+        try:
+            return int(result)
+        except (TypeError, ValueError):
+            return None
+
+
+def _check_endpoint(clients: List[RPCClient]) -> List[Optional[int]]:
+    """
+    Healthcheck de tous les clients partageant un même rpc_url : un seul
+    batch JSON-RPC, avec fallback client par client si l'endpoint répond sans
+    gérer les batchs (pas en cas d'endpoint injoignable).
+    """
+    methods = [c._latest_block_method() for c in clients]
+    batchable = [i for i, m in enumerate(methods) if m is not None]
+
+    if len(batchable) > 1:
+        results = _rpc_batch(
+            clients[0].rpc_url,
+            [(methods[i], []) for i in batchable],
+        )
+        if results is not None:
+            out: List[Optional[int]] = [None] * len(clients)
+            for i, result in zip(batchable, results):
+                out[i] = clients[i]._parse_latest_block(result)
+            return out
+
+    return [c.get_latest_block() for c in clients]
+
+
+def check_rpc_clients(clients: List[RPCClient]) -> List[Optional[int]]:
+    """
+    Healthcheck (dernier block / slot) d'une liste de clients, dans l'ordre.
+
+    Les clients sont groupés par rpc_url (un batch JSON-RPC par endpoint) et
+    les endpoints sont interrogés en parallèle.
+    """
+    groups: Dict[str, List[int]] = {}
+    for i, client in enumerate(clients):
+        groups.setdefault(client.rpc_url, []).append(i)
+
+    def _run(indexes: List[int]) -> List[Optional[int]]:
+        try:
+            return _check_endpoint([clients[i] for i in indexes])
+        except Exception as e:  # pragma: no cover - défensif
+            logger.warning(
+                "Erreur lors du healthcheck RPC (%s): %s",
+                clients[indexes[0]].rpc_url,
+                e,
+                extra={"event": "rpc_init_error"},
+            )
+            return [None] * len(indexes)
+
+    out: List[Optional[int]] = [None] * len(clients)
+    group_list = list(groups.values())
+    if len(group_list) <= 1:
+        group_results = [_run(g) for g in group_list]
+    else:
+        with ThreadPoolExecutor(max_workers=min(16, len(group_list))) as pool:
+            group_results = list(pool.map(_run, group_list))
+
+    for indexes, results in zip(group_list, group_results):
+        for i, result in zip(indexes, results):
+            out[i] = result
+    return out
 
 
 # ======================================================================
@@ -265,7 +449,9 @@ def build_rpc_clients(cfg: Any) -> Dict[str, RPCClient]:
 
     Pour chaque chain enabled=true :
       * on construit un RPCClient,
-      * on tente un healthcheck via get_latest_block(),
+      * on tente un healthcheck (dernier block / slot) ; les healthchecks sont
+        lancés en parallèle, en batch JSON-RPC pour les chains partageant un
+        même endpoint (voir check_rpc_clients),
       * on log :
           - "RPC OK: chain — block/slot N" si ça marche,
           - "RPC WARN: chain — impossible de récupérer le dernier block/slot" sinon.
@@ -278,7 +464,7 @@ def build_rpc_clients(cfg: Any) -> Dict[str, RPCClient]:
         chains_cfg = getattr(cfg, "chains", []) or []
         rpc_cfg = getattr(cfg, "rpc", {}) or {}
 
-    clients: Dict[str, RPCClient] = {}
+    built: List[RPCClient] = []
 
     for entry in chains_cfg:
         try:
@@ -308,29 +494,14 @@ def build_rpc_clients(cfg: Any) -> Dict[str, RPCClient]:
             chain_type = str(entry.get("type", "evm")).lower()
             chain_id = entry.get("chain_id")
 
-            client = RPCClient(
-                name=name,
-                rpc_url=rpc_url,
-                chain_id=chain_id,
-                chain_type=chain_type,
-            )
-
-            latest_block = client.get_latest_block()
-            if latest_block is not None:
-                logger.info(
-                    "RPC OK: %s — block/slot %s",
-                    name,
-                    latest_block,
-                    extra={"event": "rpc_ok", "chain": name, "rpc_url": rpc_url},
+            built.append(
+                RPCClient(
+                    name=name,
+                    rpc_url=rpc_url,
+                    chain_id=chain_id,
+                    chain_type=chain_type,
                 )
-            else:
-                logger.warning(
-                    "RPC WARN: %s — impossible de récupérer le dernier block/slot",
-                    name,
-                    extra={"event": "rpc_warn", "chain": name, "rpc_url": rpc_url},
-                )
-
-            clients[name] = client
+            )
 
         except Exception as e:  # pragma: no cover - défensif
             logger.warning(
@@ -339,6 +510,26 @@ def build_rpc_clients(cfg: Any) -> Dict[str, RPCClient]:
                 extra={"event": "rpc_init_error"},
             )
 
+    clients: Dict[str, RPCClient] = {}
+
+    for client, latest_block in zip(built, check_rpc_clients(built)):
+        name = client.name
+        if latest_block is not None:
+            logger.info(
+                "RPC OK: %s — block/slot %s",
+                name,
+                latest_block,
+                extra={"event": "rpc_ok", "chain": name, "rpc_url": client.rpc_url},
+            )
+        else:
+            logger.warning(
+                "RPC WARN: %s — impossible de récupérer le dernier block/slot",
+                name,
+                extra={"event": "rpc_warn", "chain": name, "rpc_url": client.rpc_url},
+            )
+
+        clients[name] = client
+
     return clients
 
 
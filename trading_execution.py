@@ -2,13 +2,51 @@
 
 from __future__ import annotations
 
+import atexit
+import threading
+import weakref
+from collections import deque
 from decimal import Decimal
-from typing import Any, Optional
+from typing import Any, Deque, Optional, Tuple
 
 from bot.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+_D0 = Decimal(0)
+
+
+def _to_decimal(x: Any) -> Decimal:
+    """
+    Conversion en Decimal sans aller-retour str() pour les types déjà
+    numériques exacts (Decimal, int). Lève si la valeur n'est pas parsable.
+    """
+    if isinstance(x, Decimal):
+        return x
+    if isinstance(x, int) and not isinstance(x, bool):
+        return Decimal(x)
+    return Decimal(str(x))
+
+
+# Moteurs en mode async_wallet_updates : la file PnL (thread daemon) est
+# vidée à la sortie du process, même si close() n'a pas été appelé.
+_ASYNC_ENGINES: "weakref.WeakSet[ExecutionEngine]" = weakref.WeakSet()
+
+
+def _close_engines_at_exit() -> None:
+    for engine in list(_ASYNC_ENGINES):
+        try:
+            engine.close()
+            # le PnL drainé doit aussi atteindre le snapshot wallets
+            flush = getattr(engine.wallet_manager, "flush", None)
+            if flush is not None:
+                flush()
+        except Exception:
+            logger.exception("ExecutionEngine: échec du drain PnL à la sortie.")
+
+
+atexit.register(_close_engines_at_exit)
+
 
 class ExecutionEngine:
     """
@@ -32,6 +70,7 @@ class ExecutionEngine:
         inner_engine: Any,
         *,
         wallet_manager: Optional[Any] = None,
+        async_wallet_updates: bool = False,
     ) -> None:
         """
         Parameters
@@ -45,10 +84,39 @@ class ExecutionEngine:
             une méthode :
                 on_trade_closed(wallet_id, realized_pnl_usd, fees_paid_usd=0)
             Si None, aucun PnL ne sera propagé.
+
+        async_wallet_updates:
+            Si True, les appels on_trade_closed sont mis en file et exécutés
+            par un thread dédié (hors du chemin d'exécution des signaux).
+            Appeler flush() pour attendre leur application (ex: avant de
+            relire l'equity) et close() à l'arrêt (la file est aussi vidée
+            à la sortie du process). Le wallet_manager doit alors tolérer des
+            appels concurrents au tick (RuntimeWalletManager sérialise les
+            accès à son engine). Par défaut False : mise à jour synchrone,
+            l'equity vue par le risk est toujours à jour.
         """
         self.inner_engine = inner_engine
         self.wallet_manager = wallet_manager
 
+        self._async_wallet_updates = async_wallet_updates
+        self._pnl_cond = threading.Condition()
+        self._pnl_q: Deque[Tuple[str, Decimal, Decimal]] = deque()
+        self._pnl_inflight = 0
+        self._pnl_closed = False
+        self._pnl_thread: Optional[threading.Thread] = None
+        if async_wallet_updates:
+            _ASYNC_ENGINES.add(self)
+
+    @property
+    def wallet_manager(self) -> Optional[Any]:
+        return self._wallet_manager
+
+    @wallet_manager.setter
+    def wallet_manager(self, wallet_manager: Optional[Any]) -> None:
+        # Callback résolu une fois (et non à chaque signal)
+        self._wallet_manager = wallet_manager
+        self._on_trade_closed = getattr(wallet_manager, "on_trade_closed", None)
+
     # ------------------------------------------------------------------ #
     # API principale
     # ------------------------------------------------------------------ #
@@ -82,17 +150,19 @@ class ExecutionEngine:
         if isinstance(meta_signal, dict):
             wallet_id = meta_signal.get("wallet_id")
 
-        if wallet_id is None:
-            meta_trade = getattr(trade, "meta", None)
-            if isinstance(meta_trade, dict):
-                wallet_id = meta_trade.get("wallet_id")
+        # meta du trade lue une seule fois (wallet_id, PnL, fees)
+        meta_trade = getattr(trade, "meta", None)
+        if not isinstance(meta_trade, dict):
+            meta_trade = None
+
+        if wallet_id is None and meta_trade is not None:
+            wallet_id = meta_trade.get("wallet_id")
 
         # 3) Extraction du PnL simulé et des fees à partir du trade
-        pnl_usd = Decimal("0")
-        fees_usd = Decimal("0")
+        pnl_usd = _D0
+        fees_usd = _D0
 
-        meta_trade = getattr(trade, "meta", None)
-        if isinstance(meta_trade, dict):
+        if meta_trade is not None:
             # On essaie différents champs possibles pour le PnL simulé
             raw_pnl = (
                 meta_trade.get("pnl_sim_usd")
@@ -101,7 +171,7 @@ class ExecutionEngine:
             )
             if raw_pnl is not None:
                 try:
-                    pnl_usd = Decimal(str(raw_pnl))
+                    pnl_usd = _to_decimal(raw_pnl)
                 except Exception:
                     logger.exception(
                         "ExecutionEngine.execute_signal: impossible de parser pnl_usd=%r",
@@ -112,7 +182,7 @@ class ExecutionEngine:
         fee_attr = getattr(trade, "fee", None)
         if fee_attr is not None:
             try:
-                fees_usd = Decimal(str(fee_attr))
+                fees_usd = _to_decimal(fee_attr)
             except Exception:
                 logger.exception(
                     "ExecutionEngine.execute_signal: impossible de parser fee=%r",
@@ -120,11 +190,11 @@ class ExecutionEngine:
                 )
         else:
             # Fallback éventuel sur meta["fees_sim_usd"]
-            if isinstance(meta_trade, dict):
+            if meta_trade is not None:
                 raw_fee = meta_trade.get("fees_sim_usd")
                 if raw_fee is not None:
                     try:
-                        fees_usd = Decimal(str(raw_fee))
+                        fees_usd = _to_decimal(raw_fee)
                     except Exception:
                         logger.exception(
                             "ExecutionEngine.execute_signal: "
@@ -133,19 +203,11 @@ class ExecutionEngine:
                         )
 
         # 4) Propagation vers RuntimeWalletManager
-        if wallet_id is not None and hasattr(self.wallet_manager, "on_trade_closed"):
-            try:
-                # Signature attendue dans RuntimeWalletManager :
-                # on_trade_closed(wallet_id, realized_pnl_usd, fees_paid_usd=0)
-                self.wallet_manager.on_trade_closed(wallet_id, pnl_usd, fees_usd)
-            except Exception:
-                logger.exception(
-                    "Erreur lors de la propagation PnL vers RuntimeWalletManager "
-                    "(wallet_id=%s, pnl_usd=%s, fees_usd=%s)",
-                    wallet_id,
-                    str(pnl_usd),
-                    str(fees_usd),
-                )
+        if wallet_id is not None and self._on_trade_closed is not None:
+            if self._async_wallet_updates:
+                self._enqueue_pnl(wallet_id, pnl_usd, fees_usd)
+            else:
+                self._apply_pnl(wallet_id, pnl_usd, fees_usd)
         else:
             logger.debug(
                 "ExecutionEngine.execute_signal: aucun wallet_id ou pas de "
@@ -154,6 +216,78 @@ class ExecutionEngine:
 
         return trade
 
+    # ------------------------------------------------------------------ #
+    # Propagation PnL asynchrone (async_wallet_updates=True)
+    # ------------------------------------------------------------------ #
+    def flush(self) -> None:
+        """Bloque jusqu'à ce que toutes les mises à jour en file soient appliquées."""
+        with self._pnl_cond:
+            while self._pnl_q or self._pnl_inflight:
+                self._pnl_cond.wait()
+
+    def close(self) -> None:
+        """Vide la file puis arrête le thread de propagation."""
+        self.flush()
+        with self._pnl_cond:
+            self._pnl_closed = True
+            self._pnl_cond.notify_all()
+            thread = self._pnl_thread
+        if thread is not None:
+            thread.join()
+
+    def _enqueue_pnl(self, wallet_id: str, pnl_usd: Decimal, fees_usd: Decimal) -> None:
+        with self._pnl_cond:
+            closed = self._pnl_closed
+            if not closed:
+                self._pnl_q.append((wallet_id, pnl_usd, fees_usd))
+                if self._pnl_thread is None:
+                    self._pnl_thread = threading.Thread(
+                        target=self._pnl_loop,
+                        name="ExecutionEngine-pnl",
+                        daemon=True,
+                    )
+                    self._pnl_thread.start()
+                self._pnl_cond.notify_all()
+        if closed:
+            # Après close() : repli synchrone plutôt que de perdre le PnL
+            self._apply_pnl(wallet_id, pnl_usd, fees_usd)
+
+    def _pnl_loop(self) -> None:
+        while True:
+            with self._pnl_cond:
+                while not self._pnl_q and not self._pnl_closed:
+                    self._pnl_cond.wait()
+                if not self._pnl_q:
+                    return
+                # On draine tout ce qui est en file en un seul passage
+                batch = list(self._pnl_q)
+                self._pnl_q.clear()
+                self._pnl_inflight = len(batch)
+            try:
+                for wallet_id, pnl_usd, fees_usd in batch:
+                    self._apply_pnl(wallet_id, pnl_usd, fees_usd)
+            finally:
+                with self._pnl_cond:
+                    self._pnl_inflight = 0
+                    self._pnl_cond.notify_all()
+
+    def _apply_pnl(self, wallet_id: str, pnl_usd: Decimal, fees_usd: Decimal) -> None:
+        on_trade_closed = self._on_trade_closed
+        if on_trade_closed is None:
+            return
+        try:
+            # Signature attendue dans RuntimeWalletManager :
+            # on_trade_closed(wallet_id, realized_pnl_usd, fees_paid_usd=0)
+            on_trade_closed(wallet_id, pnl_usd, fees_usd)
+        except Exception:
+            logger.exception(
+                "Erreur lors de la propagation PnL vers RuntimeWalletManager "
+                "(wallet_id=%s, pnl_usd=%s, fees_usd=%s)",
+                wallet_id,
+                str(pnl_usd),
+                str(fees_usd),
+            )
+
 
 __all__ = ["ExecutionEngine"]
 
@@ -2,14 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from decimal import Decimal, getcontext
+from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, Optional
 import uuid
 
-# Haute précision pour tous les calculs prix/taille/PnL
-getcontext().prec = 50
-
 
 # ======================================================================
 # Enums / Types de base
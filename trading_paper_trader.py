@@ -1,19 +1,74 @@
 # file: bot/trading/paper_trader.py
 from __future__ import annotations
 
+import atexit
 import os
-from dataclasses import dataclass, field
-from datetime import datetime
-from decimal import Decimal, getcontext
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from decimal import Decimal, localcontext
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
 
 from bot.core.logging import get_logger
 from .models import AgentStatus, PnLStats, TradeSide, Trade
-from .store import TradeStore, TradeStoreConfig, Trade as StoreTrade
+from .store import IncrementalPnL, TradeStore, TradeStoreConfig, Trade as StoreTrade
 
 logger = get_logger(__name__)
-getcontext().prec = 50  # haute précision pour les montants
+
+# PaperTraders vivants : les trades encore bufferisés (écritures groupées)
+# sont écrits à la sortie du process. WeakSet : l'atexit ne retient aucune
+# instance en vie.
+_TRADERS: "weakref.WeakSet[PaperTrader]" = weakref.WeakSet()
+
+
+def _close_traders_at_exit() -> None:
+    for trader in list(_TRADERS):
+        trader.close()
+
+
+atexit.register(_close_traders_at_exit)
+
+# NB: pas de `getcontext().prec = 50` global — il ralentissait toute
+# l'arithmétique Decimal du process (execution, live_policies...). Les montants
+# restent sous 28 chiffres ; seule la division qty = notional / price passe par
+# un contexte local à 50 chiffres avant le quantize.
+_QTY_PREC = 50
+
+_D0 = Decimal("0")
+_QUANT8 = Decimal("0.00000001")
+_ZERO8 = _D0.quantize(_QUANT8)  # Decimal("0E-8"), valeur "0" quantizée
+
+
+# ======================================================================
+# Normalisation chain / symbol / side (peu de valeurs distinctes : cache)
+# ======================================================================
+
+_SIDE_MAP: Dict[str, TradeSide] = {
+    "buy": TradeSide.BUY,
+    "long": TradeSide.BUY,
+    "sell": TradeSide.SELL,
+    "short": TradeSide.SELL,
+}
+
+
+@lru_cache(maxsize=256)
+def _norm_chain(chain: str) -> str:
+    return chain.lower()
+
+
+@lru_cache(maxsize=256)
+def _norm_symbol(symbol: str) -> str:
+    return symbol.upper()
+
+
+@lru_cache(maxsize=256)
+def _norm_side_str(side: str) -> str:
+    return side.lower()
 
 
 # ======================================================================
@@ -21,14 +76,23 @@ getcontext().prec = 50  # haute précision pour les montants
 # ======================================================================
 
 
-@dataclass
-class TradeSignal:
+# Meta partagée en lecture seule : aucun dict alloué par signal quand la meta
+# n'est pas utilisée. Passer `meta=dict(...)` uniquement si nécessaire.
+_EMPTY_META: Mapping[str, Any] = MappingProxyType({})
+
+
+class TradeSignal(NamedTuple):
+    """
+    Signal immuable (NamedTuple : instanciation plus légère qu'un dataclass,
+    utile quand les signaux sont créés à chaque tick).
+    """
+
     chain: str
     symbol: str
     side: TradeSide
     notional_usd: Decimal
     entry_price: Optional[Decimal] = None
-    meta: Dict[str, Any] = field(default_factory=dict)
+    meta: Mapping[str, Any] = _EMPTY_META
 
 
 # ======================================================================
@@ -73,7 +137,8 @@ class PaperTrader:
     """
     Moteur de paper trading :
     - journalise les trades dans un TradeStore
-    - calcule un PnL agrégé via TradeStore.compute_pnl()
+    - calcule un PnL agrégé (équivalent TradeStore.compute_pnl()) mis à jour
+      incrémentalement à chaque trade, sans relire tout le JSONL
     - expose un AgentStatus lisible par le runtime / wallet manager / dashboard
 
     M11 : prise en charge des prix "réels" via:
@@ -100,9 +165,51 @@ class PaperTrader:
             self.store = TradeStore(store_cfg)
 
         self._last_pnl: Optional[PnLStats] = None
+
+        # Horloge du heartbeat : datetime UTC mis en cache à la seconde (une
+        # précision à la seconde suffit pour heartbeat / updated_at ; les
+        # created_at des trades restent à pleine précision via Trade.new).
+        self._now_sec = -1  # force le calcul au premier _now()
+        self._now_dt: datetime
+
+        # PnL incrémental : une seule lecture complète du store au démarrage,
+        # puis mise à jour O(1) par trade (voir reload_pnl() après un reset).
+        self._pnl_state = IncrementalPnL.from_trades(
+            self.store.get_trades(), self.store.config.max_trades
+        )
+
+        # Debug : PAPER_PNL_VERIFY=1 recoupe avec store.compute_pnl() tous les
+        # PAPER_PNL_VERIFY_EVERY trades (défaut 100).
+        self._pnl_verify = os.getenv("PAPER_PNL_VERIFY", "0").strip().lower() in ("1", "true", "yes")
+        try:
+            self._pnl_verify_every = max(1, int(os.getenv("PAPER_PNL_VERIFY_EVERY", "100")))
+        except ValueError:
+            self._pnl_verify_every = 100
+        self._pnl_verify_count = 0
+
+        # Écritures groupées : les trades sont bufferisés puis écrits en un
+        # seul append_trades() quand PAPER_BATCH_MAX trades sont en attente ou
+        # que PAPER_BATCH_MAX_MS se sont écoulées depuis le dernier flush.
+        # Un signal isolé est donc écrit immédiatement ; une rafale est groupée
+        # et un timer écrit la fin de rafale à l'échéance.
+        try:
+            self._batch_max = max(1, int(os.getenv("PAPER_BATCH_MAX", "32")))
+        except ValueError:
+            self._batch_max = 32
+        try:
+            self._batch_max_s = max(0.0, float(os.getenv("PAPER_BATCH_MAX_MS", "50"))) / 1000.0
+        except ValueError:
+            self._batch_max_s = 0.05
+        # lignes JSONL déjà encodées (une erreur d'encodage reste sur le signal)
+        self._pending: List[bytes] = []
+        self._pending_deadline = time.monotonic() + self._batch_max_s
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        _TRADERS.add(self)
+
         self._agent_status = AgentStatus(
             is_running=True,
-            last_heartbeat=datetime.utcnow(),
+            last_heartbeat=self._now(),
             meta={},
         )
 
@@ -115,7 +222,8 @@ class PaperTrader:
                 "PaperTrader: valeur PAPER_FEE_RATE invalide (%s), fallback à 0.",
                 raw_fee,
             )
-            self._fee_rate = Decimal("0")
+            self._fee_rate = _D0
+        self._has_fee = self._fee_rate > 0
 
         logger.info(
             "PaperTrader initialisé (path=%s, max_trades=%d, fee_rate=%s)",
@@ -128,15 +236,24 @@ class PaperTrader:
     # Helpers
     # ------------------------------------------------------------------
 
+    def _now(self) -> datetime:
+        """datetime UTC courant, tronqué et mis en cache à la seconde."""
+        sec = time.time_ns() // 1_000_000_000
+        if sec != self._now_sec:
+            self._now_sec = sec
+            # naïf UTC, comme les autres timestamps du module (utcnow)
+            self._now_dt = datetime.fromtimestamp(sec, timezone.utc).replace(tzinfo=None)
+        return self._now_dt
+
     def _normalize_chain(self, chain: Optional[str]) -> str:
         if not chain:
             return self.config.default_chain
-        return str(chain).lower()
+        return _norm_chain(chain if type(chain) is str else str(chain))
 
     def _normalize_symbol(self, symbol: Optional[str]) -> str:
         if not symbol:
             return self.config.default_symbol
-        return str(symbol).upper()
+        return _norm_symbol(symbol if type(symbol) is str else str(symbol))
 
     def _normalize_side(self, side: Any) -> TradeSide:
         """
@@ -148,14 +265,10 @@ class PaperTrader:
 
         # SignalSide.BUY / SELL → value="buy"/"sell"
         val = getattr(side, "value", side)
-        s = str(val).lower()
-
-        if s in ("buy", "long"):
-            return TradeSide.BUY
-        if s in ("sell", "short"):
-            return TradeSide.SELL
-
-        raise ValueError(f"PaperTrader._normalize_side: side inconnu: {side!r}")
+        try:
+            return _SIDE_MAP[_norm_side_str(val if type(val) is str else str(val))]
+        except KeyError:
+            raise ValueError(f"PaperTrader._normalize_side: side inconnu: {side!r}") from None
 
     def _ensure_price(
         self,
@@ -224,6 +337,79 @@ class PaperTrader:
         )
         return Decimal("1.0"), True, "fallback_1.0"
 
+    def _enqueue_trade(self, line: bytes) -> None:
+        """Bufferise un trade encodé ; écrit le lot si un seuil (taille / délai) est atteint."""
+        with self._pending_lock:
+            self._pending.append(line)
+            now = time.monotonic()
+            due = len(self._pending) >= self._batch_max or now >= self._pending_deadline
+            if not due and self._flush_timer is None:
+                # fin de rafale : écrite à l'échéance même sans nouveau signal
+                timer = threading.Timer(self._pending_deadline - now, self._flush)
+                timer.daemon = True
+                self._flush_timer = timer
+                timer.start()
+        if due:
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Écrit les trades en attente dans le store. Les lignes étant déjà
+        encodées, seule une erreur d'I/O peut survenir : les trades restent
+        alors en file et seront réécrits au prochain flush.
+        """
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending = self._pending
+            if pending:
+                try:
+                    self.store.append_lines(pending)
+                except Exception:
+                    logger.exception(
+                        "PaperTrader: échec écriture de %d trade(s), nouvel essai au prochain flush",
+                        len(pending),
+                    )
+                else:
+                    self._pending = []
+            self._pending_deadline = time.monotonic() + self._batch_max_s
+
+    def close(self) -> None:
+        """Écrit les trades encore en attente (arrêt du runtime / fin de run)."""
+        self._flush()
+
+    def reload_pnl(self) -> PnLStats:
+        """
+        Reconstruit le PnL incrémental depuis le store (après un reset_trades
+        ou une écriture externe du JSONL).
+        """
+        self._flush()
+        self._pnl_state = IncrementalPnL.from_trades(
+            self.store.get_trades(), self.store.config.max_trades
+        )
+        self._last_pnl = self._pnl_state.to_stats()
+        return self._last_pnl
+
+    def _verify_pnl(self, pnl: PnLStats) -> PnLStats:
+        """Recoupe le PnL incrémental avec un recalcul complet (debug)."""
+        self._flush()
+        full = self.store.compute_pnl()
+        if (
+            abs(full.total - pnl.total) > Decimal("0.00000001")
+            or full.nb_trades != pnl.nb_trades
+            or full.nb_winners != pnl.nb_winners
+            or full.nb_losers != pnl.nb_losers
+        ):
+            logger.warning(
+                "PaperTrader: PnL incrémental divergent (incr=%s full=%s), resync",
+                pnl.to_dict(),
+                full.to_dict(),
+            )
+            self.reload_pnl()
+            return full
+        return pnl
+
     def _compute_simulated_pnl_and_fees(
         self,
         *,
@@ -235,6 +421,7 @@ class PaperTrader:
         notional_usd: Decimal,
         prices: Optional[Dict[Tuple[str, str], Any]] = None,
         price_missing: bool = False,
+        price_source: str = "",
     ) -> Tuple[Decimal, Decimal]:
         """
         Calcule un PnL et des fees simulés pour CE trade uniquement.
@@ -244,15 +431,20 @@ class PaperTrader:
         - Si `price_missing=True`, on renvoie PnL=0 et fees=0 (mode safe).
         - Sinon, PnL=0 si pas de prix marché exploitable.
         - Fees = notional * self._fee_rate quand price_missing=False.
-        """
 
-        quant = Decimal("0.00000001")
+        Si `price_source == "price_provider"`, le prix d'entrée EST déjà
+        `prices[(chain, symbol)]` : le mark-to-market vaut exactement 0, on
+        évite de re-parser le prix et la multiplication.
+        """
 
         # Mode "safe" si aucun prix exploitable
         if price_missing:
-            pnl_sim = Decimal("0")
-            fees_sim = Decimal("0")
-            return pnl_sim.quantize(quant), fees_sim.quantize(quant)
+            return _ZERO8, _ZERO8
+
+        fees_sim = (notional_usd * self._fee_rate).quantize(_QUANT8) if self._has_fee else _ZERO8
+
+        if price_source == "price_provider":
+            return _ZERO8, fees_sim
 
         mark_price: Optional[Decimal] = None
         if prices is not None:
@@ -270,22 +462,16 @@ class PaperTrader:
                         )
                         mark_price = None
 
-        pnl_sim = Decimal("0")
-        if mark_price is not None and qty > 0:
-            if side == TradeSide.BUY:
-                pnl_sim = (mark_price - entry_price) * qty
-            else:
-                # SELL / SHORT logique
-                pnl_sim = (entry_price - mark_price) * qty
-
-        fees_sim = Decimal("0")
-        if self._fee_rate > 0:
-            fees_sim = notional_usd * self._fee_rate
+        if mark_price is None or qty <= 0:
+            return _ZERO8, fees_sim
 
-        pnl_sim = pnl_sim.quantize(quant)
-        fees_sim = fees_sim.quantize(quant)
+        if side == TradeSide.BUY:
+            pnl_sim = (mark_price - entry_price) * qty
+        else:
+            # SELL / SHORT logique
+            pnl_sim = (entry_price - mark_price) * qty
 
-        return pnl_sim, fees_sim
+        return pnl_sim.quantize(_QUANT8), fees_sim
 
     # ------------------------------------------------------------------
     # Coeur : traitement d'un TradeSignal
@@ -306,10 +492,25 @@ class PaperTrader:
         NB: `signal` peut être le TradeSignal interne OU un bot.core.signals.TradeSignal
             (ou encore le Signal memecoin_farming).
         """
-        chain = self._normalize_chain(getattr(signal, "chain", None))
-        symbol = self._normalize_symbol(getattr(signal, "symbol", None))
+        # Lecture directe des champs (cas nominal : TradeSignal / Signal complets).
+        # Les signaux "partiels" (ex: bot.core.signals sans chain) retombent
+        # sur le chemin tolérant via getattr.
+        try:
+            raw_chain = signal.chain
+            raw_symbol = signal.symbol
+            raw_side = signal.side
+            raw_notional = signal.notional_usd
+            base_meta = signal.meta
+        except AttributeError:
+            raw_chain = getattr(signal, "chain", None)
+            raw_symbol = getattr(signal, "symbol", None)
+            raw_side = getattr(signal, "side", None)
+            raw_notional = getattr(signal, "notional_usd", Decimal("0"))
+            base_meta = getattr(signal, "meta", {})
+
+        chain = self._normalize_chain(raw_chain)
+        symbol = self._normalize_symbol(raw_symbol)
 
-        raw_side = getattr(signal, "side", None)
         if raw_side is None:
             raise ValueError("PaperTrader.process_signal: signal.side manquant")
 
@@ -324,7 +525,6 @@ class PaperTrader:
         )
 
         # Notional en Decimal (tolère float / int / Decimal)
-        raw_notional = getattr(signal, "notional_usd", Decimal("0"))
         if isinstance(raw_notional, Decimal):
             notional = raw_notional
         else:
@@ -339,9 +539,11 @@ class PaperTrader:
 
         # Quantité (évite Decimal / float : ici tout est Decimal)
         if price <= 0 or notional <= 0:
-            qty = Decimal("0")
+            qty = _D0
         else:
-            qty = (notional / price).quantize(Decimal("0.00000001"))
+            with localcontext() as ctx:
+                ctx.prec = _QTY_PREC
+                qty = (notional / price).quantize(_QUANT8)
 
         # PnL/fees simulés pour ce trade (utile pour le dashboard plus tard)
         pnl_sim, fees_sim = self._compute_simulated_pnl_and_fees(
@@ -353,12 +555,12 @@ class PaperTrader:
             notional_usd=notional,
             prices=prices,
             price_missing=price_missing,
+            price_source=price_source,
         )
 
         # Trade logique (modèle principal)
-        base_meta = getattr(signal, "meta", {}) or {}
         meta: Dict[str, Any] = {
-            **base_meta,
+            **(base_meta or {}),
             "pnl_sim_usd": str(pnl_sim),
             "fees_sim_usd": str(fees_sim),
             "price_source": price_source,
@@ -396,18 +598,29 @@ class PaperTrader:
         # PnL global AVANT ce trade
         prev_total = self._last_pnl.total if self._last_pnl is not None else Decimal("0")
 
-        # On journalise le trade
-        self.store.append_trade(store_trade)
+        # Encodage immédiat : un trade non sérialisable (meta exotique) fait
+        # échouer CE signal, comme append_trade, sans bloquer la file d'écriture
+        line = self.store.encode_trade(store_trade)
+
+        # PnL global APRÈS ce trade (incrémental, sans relire le store) :
+        # compté avant l'écriture, indépendamment de son résultat
+        self._pnl_state.add(store_trade)
+
+        # On journalise le trade (écriture groupée, voir _enqueue_trade)
+        self._enqueue_trade(line)
 
-        # PnL global APRÈS ce trade
-        pnl = self.store.compute_pnl()
+        now = self._now()
+        pnl = self._pnl_state.to_stats(updated_at=now)
+        if self._pnl_verify:
+            self._pnl_verify_count += 1
+            if self._pnl_verify_count % self._pnl_verify_every == 0:
+                pnl = self._verify_pnl(pnl)
         self._last_pnl = pnl
 
         # PnL de CE trade = delta du PnL total
         trade_pnl = pnl.total - prev_total
 
         # Mise à jour de l’état de l’agent
-        now = datetime.utcnow()
         self._agent_status.last_heartbeat = now
         self._agent_status.last_trade = trade
         self._agent_status.pnl = pnl
@@ -447,13 +660,15 @@ class PaperTrader:
         return trade
 
     def get_pnl(self) -> Optional[PnLStats]:
+        self._flush()
         return self._last_pnl
 
     def get_recent_trades(self, limit: int = 50):
+        self._flush()
         return self.store.get_recent_trades(limit=limit)
 
     def get_agent_status(self) -> AgentStatus:
-        self._agent_status.last_heartbeat = datetime.utcnow()
+        self._agent_status.last_heartbeat = self._now()
         return self._agent_status
 
 
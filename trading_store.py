@@ -5,17 +5,39 @@ from __future__ import annotations
 import json
 import os
 import uuid
-from dataclasses import dataclass, asdict
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+try:  # encodeur / décodeur JSON en C, optionnel
+    import orjson
+except ImportError:  # pragma: no cover - fallback stdlib
+    orjson = None  # type: ignore[assignment]
 
 from bot.core.logging import get_logger
 from bot.trading.models import TradeSide, PnLStats  # Enum buy/sell + PnLStats
 
 logger = get_logger(__name__)
-getcontext().prec = 50  # haute précision pour les prix / quantités
+
+# Précision étendue uniquement pour le prix moyen pondéré (division cumulée
+# sur tout l'historique) ; le reste tourne au contexte Decimal par défaut.
+_AVG_PRICE_PREC = 50
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+else:  # pragma: no cover - fallback stdlib
+    _loads = json.loads
+
+    def _dumps_line(obj: Any) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
 
 
 # ======================================================================
@@ -134,6 +156,117 @@ class PnLSummary:
         }
 
 
+@dataclass
+class _PnLBucket:
+    """Sommes courantes d'un (chain, symbol) pour le PnL incrémental."""
+
+    qty: Decimal = Decimal("0")  # somme des qty (BUY + SELL, comme le 1er passage)
+    pq: Decimal = Decimal("0")  # somme des price * qty
+    sell_qty: Decimal = Decimal("0")
+    sell_pq: Decimal = Decimal("0")
+    sell_prices: List[Decimal] = field(default_factory=list)  # triés (win/loss)
+    realized: Decimal = Decimal("0")
+    winners: int = 0
+    losers: int = 0
+
+
+class IncrementalPnL:
+    """
+    Équivalent incrémental de `TradeStore.compute_pnl()` (sans prix de marché).
+
+    Le 1er passage de `compute_positions_and_pnl` revient à un prix moyen
+    pondéré sum(price * qty) / sum(qty) par (chain, symbol) sur la fenêtre des
+    `max_trades` derniers trades ; le realized PnL d'un SELL vaut
+    (price - avg) * qty. On garde donc des sommes courantes par bucket et les
+    prix de SELL triés pour compter gagnants / perdants : ajouter (ou sortir de
+    la fenêtre) un trade ne recalcule que son bucket, sans relire le JSONL.
+    """
+
+    def __init__(self, max_trades: int) -> None:
+        self.max_trades = max_trades
+        self._window: Deque[Trade] = deque()
+        self._buckets: Dict[Tuple[str, str], _PnLBucket] = {}
+        self._realized = Decimal("0")
+        self._winners = 0
+        self._losers = 0
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade], max_trades: int) -> "IncrementalPnL":
+        state = cls(max_trades)
+        for t in trades:
+            state.add(t)
+        return state
+
+    def add(self, trade: Trade) -> None:
+        self._apply(trade, 1)
+        self._window.append(trade)
+        if len(self._window) > self.max_trades:
+            self._apply(self._window.popleft(), -1)
+
+    def _apply(self, t: Trade, sign: int) -> None:
+        key = (t.chain, t.symbol)
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _PnLBucket()
+
+        pq = t.price * t.qty
+        if sign > 0:
+            b.qty += t.qty
+            b.pq += pq
+        else:
+            b.qty -= t.qty
+            b.pq -= pq
+
+        if t.side == TradeSide.SELL and t.qty > 0:
+            if sign > 0:
+                b.sell_qty += t.qty
+                b.sell_pq += pq
+                insort(b.sell_prices, t.price)
+            else:
+                b.sell_qty -= t.qty
+                b.sell_pq -= pq
+                del b.sell_prices[bisect_left(b.sell_prices, t.price)]
+
+        # Recalcul du bucket (prix moyen + realized + gagnants / perdants)
+        self._realized -= b.realized
+        self._winners -= b.winners
+        self._losers -= b.losers
+
+        if b.qty > 0 and b.sell_prices:
+            with localcontext() as ctx:
+                ctx.prec = _AVG_PRICE_PREC
+                avg = b.pq / b.qty
+            b.realized = b.sell_pq - avg * b.sell_qty
+            prices = b.sell_prices
+            b.winners = len(prices) - bisect_right(prices, avg)
+            b.losers = bisect_left(prices, avg)
+        else:
+            b.realized = Decimal("0")
+            b.winners = 0
+            b.losers = 0
+
+        self._realized += b.realized
+        self._winners += b.winners
+        self._losers += b.losers
+
+        if sign < 0 and not b.qty and not b.sell_prices:
+            del self._buckets[key]
+
+    def to_stats(self, updated_at: Optional[datetime] = None) -> PnLStats:
+        decided = self._winners + self._losers
+        return PnLStats(
+            currency="USD",
+            realized=self._realized,
+            unrealized=Decimal("0"),
+            total=self._realized,
+            win_rate=self._winners / decided if decided > 0 else 0.0,
+            nb_trades=len(self._window),
+            nb_winners=self._winners,
+            nb_losers=self._losers,
+            updated_at=updated_at if updated_at is not None else datetime.utcnow(),
+        )
+
+
 # ======================================================================
 # Config + Store
 # ======================================================================
@@ -167,11 +300,31 @@ class TradeStore:
     # Ecriture
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def encode_trade(trade: Trade) -> bytes:
+        """Ligne JSONL (avec "\n") d'un trade. Lève TypeError si non sérialisable."""
+        return _dumps_line(trade.to_dict())
+
     def append_trade(self, trade: Trade) -> None:
         path = self.config.path
-        line = json.dumps(trade.to_dict(), ensure_ascii=False)
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        with open(path, "ab") as f:
+            f.write(self.encode_trade(trade))
+
+    def append_trades(self, trades: List[Trade]) -> None:
+        """Écrit un lot de trades : une ouverture de fichier et un seul write()."""
+        if trades:
+            self.append_lines([self.encode_trade(t) for t in trades])
+
+    def append_lines(self, lines: List[bytes]) -> None:
+        """
+        Écrit des lignes déjà encodées (voir encode_trade) en un seul write().
+        Seules des erreurs d'I/O peuvent lever ici.
+        """
+        if not lines:
+            return
+        path = self.config.path
+        with open(path, "ab") as f:
+            f.write(b"".join(lines))
 
     # ------------------------------------------------------------------
     # Lecture
@@ -189,7 +342,7 @@ class TradeStore:
                 if not line:
                     continue
                 try:
-                    data = json.loads(line)
+                    data = _loads(line)
                     trades.append(Trade.from_dict(data))
                 except Exception:
                     logger.exception(
@@ -244,9 +397,11 @@ class TradeStore:
                 if pos.total_qty == 0:
                     new_avg_price = t.price
                 else:
-                    new_avg_price = (
-                        (pos.avg_entry_price * pos.total_qty) + (t.price * t.qty)
-                    ) / new_total_qty
+                    with localcontext() as ctx:
+                        ctx.prec = _AVG_PRICE_PREC
+                        new_avg_price = (
+                            (pos.avg_entry_price * pos.total_qty) + (t.price * t.qty)
+                        ) / new_total_qty
             else:
                 new_avg_price = pos.avg_entry_price
 
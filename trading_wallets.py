@@ -1,14 +1,31 @@
 # bot/trading/wallets.py
 from __future__ import annotations
 
+import atexit
 import json
 import os
-from dataclasses import dataclass, field, asdict
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
 
+try:  # encodeur JSON en C, optionnel
+    import orjson
+except ImportError:  # pragma: no cover - fallback stdlib
+    orjson = None  # type: ignore[assignment]
 
-@dataclass
+if orjson is not None:
+    _dumps_bytes = orjson.dumps
+else:  # pragma: no cover - fallback stdlib
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(slots=True)
 class WalletState:
     address: str
     label: str = ""
@@ -17,15 +34,52 @@ class WalletState:
     alert_on_activity: bool = True
 
     tx_count: int = 0
-    total_notional_usd: Decimal = Decimal("0")
+    # compteur indicatif : float suffit (sérialisé en float de toute façon)
+    total_notional_usd: float = 0.0
     last_seen_ts: Optional[str] = None
     last_chain: Optional[str] = None
 
+    # fragment JSON de la dernière sérialisation (None = à reconstruire)
+    _json_cache: Optional[bytes] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def to_json_bytes(self) -> bytes:
+        b = self._json_cache
+        if b is None:
+            b = _dumps_bytes(self.to_dict())
+            self._json_cache = b
+        return b
+
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        # JSON friendly pour Decimal
-        d["total_notional_usd"] = float(self.total_notional_usd)
-        return d
+        # pas d'asdict() : évite la copie récursive à chaque _save / list_wallets
+        return {
+            "address": self.address,
+            "label": self.label,
+            "tags": list(self.tags),
+            "enabled": self.enabled,
+            "alert_on_activity": self.alert_on_activity,
+            "tx_count": self.tx_count,
+            "total_notional_usd": float(self.total_notional_usd),
+            "last_seen_ts": self.last_seen_ts,
+            "last_chain": self.last_chain,
+        }
+
+
+# Managers vivants : les sauvegardes étant debouncées (timer daemon), on
+# écrit les mutations encore en attente à la sortie du process.
+_MANAGERS: "weakref.WeakSet[WalletManager]" = weakref.WeakSet()
+
+
+def _flush_managers_at_exit() -> None:
+    for mgr in list(_MANAGERS):
+        try:
+            mgr.flush()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_managers_at_exit)
 
 
 class WalletManager:
@@ -35,6 +89,12 @@ class WalletManager:
     - persistance JSON (data/godmode/wallets.json)
     - MAJ des stats à chaque event pertinent
     - envoi d'alertes via AlertEngine si activity détectée
+
+    Les sauvegardes sont coalescées : chaque mutation marque le manager
+    "dirty" et l'écriture n'a lieu qu'au plus toutes les `save_interval_s`
+    secondes (ou après `save_max_pending` mutations). Un timer flush au
+    repos, et les mutations en attente sont écrites à la sortie du process
+    (`flush()` reste appelable explicitement avant l'arrêt du bot).
     """
 
     def __init__(
@@ -42,13 +102,32 @@ class WalletManager:
         path: str,
         alert_engine: Optional[Any] = None,
         autosave: bool = True,
+        save_interval_s: float = 1.0,
+        save_max_pending: int = 64,
     ) -> None:
         self.path = path
         self.alert_engine = alert_engine
         self.autosave = autosave
 
+        self._dir = os.path.dirname(path)
+        self._tmp_path = path + ".tmp"
+        self._dir_ready = False
+
         self._wallets: Dict[str, WalletState] = {}
-        self._load()
+
+        # Etat du debounce des sauvegardes
+        self._save_interval_s = max(float(save_interval_s), 0.0)
+        self._save_max_pending = max(int(save_max_pending), 1)
+        self._dirty = False
+        self._pending_events = 0
+        self._last_save_ts = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+        # Chargement JSON différé au premier accès (ne bloque pas le startup)
+        self._loaded = False
+
+        _MANAGERS.add(self)
 
     # ------------------------------------------------------------------ #
     # API publique                                                       #
@@ -56,6 +135,7 @@ class WalletManager:
 
     def list_wallets(self) -> List[Dict[str, Any]]:
         """Retourne les wallets en dict (pour API / debug)."""
+        self._ensure_loaded()
         return [w.to_dict() for w in self._wallets.values()]
 
     def add_wallet(
@@ -65,7 +145,9 @@ class WalletManager:
         tags: Optional[List[str]] = None,
         alert_on_activity: bool = True,
         enabled: bool = True,
+        flush: bool = True,
     ) -> WalletState:
+        self._ensure_loaded()
         addr = self._norm(address)
         w = self._wallets.get(addr)
         if w is None:
@@ -76,18 +158,24 @@ class WalletManager:
                 enabled=enabled,
                 alert_on_activity=alert_on_activity,
             )
-            self._wallets[addr] = w
+            with self._lock:
+                self._wallets[addr] = w
         else:
-            # mise à jour éventuelle du label / tags
-            if label:
-                w.label = label
-            if tags:
-                w.tags = tags
-            w.alert_on_activity = alert_on_activity
-            w.enabled = enabled
+            # mise à jour éventuelle du label / tags (sous le lock de _save :
+            # le timer de flush ne doit pas cacher un fragment périmé)
+            with self._lock:
+                if label:
+                    w.label = label
+                if tags:
+                    w.tags = tags
+                w.alert_on_activity = alert_on_activity
+                w.enabled = enabled
+                w._json_cache = None
 
         if self.autosave:
-            self._save()
+            self._mark_dirty()
+            if flush:
+                self.flush()
         return w
 
     def process_event(
@@ -98,7 +186,7 @@ class WalletManager:
         from_addr: Optional[str],
         to_addr: Optional[str],
         token: Optional[str],
-        notional_usd: Decimal,
+        notional_usd: Union[float, Decimal],
         raw_event: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
@@ -106,62 +194,186 @@ class WalletManager:
         Met à jour les wallets s'ils sont dans la watchlist
         et envoie des alertes si nécessaire.
         """
-        involved = set()
+        if not self._loaded:
+            self._ensure_loaded()
+
+        mutated = self._apply_event(
+            chain, tx_hash, from_addr, to_addr, token, notional_usd, raw_event
+        )
+        if mutated and self.autosave:
+            self._mark_dirty()
+
+    def process_events(self, events: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Variante batch de process_event : chaque event est un mapping avec
+        les mêmes clés que les kwargs de process_event. Une seule demande de
+        sauvegarde pour tout le lot.
+
+        Retourne le nombre d'events ayant touché au moins un wallet surveillé.
+        """
+        if not self._loaded:
+            self._ensure_loaded()
+
+        apply_event = self._apply_event
+        hits = 0
+        for ev in events:
+            if apply_event(
+                ev.get("chain"),
+                ev.get("tx_hash"),
+                ev.get("from_addr"),
+                ev.get("to_addr"),
+                ev.get("token"),
+                ev.get("notional_usd") or 0,
+                ev.get("raw_event"),
+            ):
+                hits += 1
+
+        if hits and self.autosave:
+            self._mark_dirty()
+        return hits
+
+    def flush(self) -> None:
+        """
+        Force l'écriture sur disque si des mutations sont en attente.
+        En cas d'échec (disque plein, permissions...), le manager reste
+        "dirty" et un nouvel essai est programmé après `save_interval_s`.
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            if not self._save():
+                timer = threading.Timer(self._save_interval_s, self.flush)
+                timer.daemon = True
+                self._flush_timer = timer
+                timer.start()
+                return
+            self._dirty = False
+            self._pending_events = 0
+            self._last_save_ts = time.monotonic()
+
+    def _apply_event(
+        self,
+        chain: str,
+        tx_hash: str,
+        from_addr: Optional[str],
+        to_addr: Optional[str],
+        token: Optional[str],
+        notional_usd: Union[float, Decimal],
+        raw_event: Optional[Dict[str, Any]],
+    ) -> bool:
+        """Applique un event sans sauvegarde. True si un wallet a été mis à jour."""
+        # normalisation inline (cf. _norm) : la grande majorité des events
+        # ne concerne aucun wallet surveillé, on sort au plus vite
+        f = from_addr.strip().lower() if from_addr else None
+        t = to_addr.strip().lower() if to_addr else None
+        wallets = self._wallets
+        wf = wallets.get(f) if f else None
+        wt = wallets.get(t) if t and t != f else None
+        if wf is None and wt is None:
+            return False
 
-        if from_addr:
-            involved.add(self._norm(from_addr))
-        if to_addr:
-            involved.add(self._norm(to_addr))
+        # Valeurs communes aux deux côtés : calculées une fois
+        notional_f = float(notional_usd)
+        ts = None
+        if raw_event:
+            ts = raw_event.get("ts") or raw_event.get("timestamp")
 
-        for addr in involved:
-            w = self._wallets.get(addr)
-            if not w or not w.enabled:
+        mutated = False
+        for w in (wf, wt):
+            if w is None or not w.enabled:
                 continue
+            mutated = True
+            self._touch_wallet(w, chain, tx_hash, token, notional_f, ts)
+        return mutated
 
+    def _touch_wallet(
+        self,
+        w: WalletState,
+        chain: str,
+        tx_hash: str,
+        token: Optional[str],
+        notional_f: float,
+        ts: Optional[str],
+    ) -> None:
+        # sous le lock tenu par flush() / _save() : sinon le timer de flush
+        # peut remettre en cache un fragment construit avec les anciens champs
+        with self._lock:
             w.tx_count += 1
-            w.total_notional_usd += notional_usd
-            w.last_seen_ts = (raw_event or {}).get("ts") or (raw_event or {}).get(
-                "timestamp"
-            )
+            w.total_notional_usd += notional_f
+            w.last_seen_ts = ts
             w.last_chain = chain
+            w._json_cache = None
 
-            if self.alert_engine is not None and w.alert_on_activity:
-                try:
-                    msg = (
-                        f"Activité sur wallet surveillé {w.label} ({w.address}) "
-                        f"sur {chain}: ~{float(notional_usd):,.0f} USD "
-                        f"{token or ''} — tx={tx_hash}"
-                    )
-                    self.alert_engine.info(
-                        msg,
-                        source="wallet_manager",
-                        wallet_address=w.address,
-                        wallet_label=w.label,
-                        chain=chain,
-                        token=token,
-                        notional_usd=float(notional_usd),
-                        tx_hash=tx_hash,
-                        tags=list(w.tags),
-                    )
-                except Exception:
-                    # on ne laisse jamais tomber à cause d'une alerte
-                    pass
-
-        if self.autosave:
-            self._save()
+        alert = self.alert_engine
+        if alert is not None and w.alert_on_activity:
+            try:
+                msg = (
+                    f"Activité sur wallet surveillé {w.label} ({w.address}) "
+                    f"sur {chain}: ~{notional_f:,.0f} USD "
+                    f"{token or ''} — tx={tx_hash}"
+                )
+                alert.info(
+                    msg,
+                    source="wallet_manager",
+                    wallet_address=w.address,
+                    wallet_label=w.label,
+                    chain=chain,
+                    token=token,
+                    notional_usd=notional_f,
+                    tx_hash=tx_hash,
+                    tags=list(w.tags),
+                )
+            except Exception:
+                # on ne laisse jamais tomber à cause d'une alerte
+                pass
 
     # ------------------------------------------------------------------ #
     # Persistance                                                        #
     # ------------------------------------------------------------------ #
 
+    def _mark_dirty(self) -> None:
+        """
+        Enregistre une mutation et déclenche une sauvegarde si l'intervalle
+        est écoulé ou si trop de mutations sont en attente. Sinon, un timer
+        se charge du flush quand le flux d'events se calme.
+        """
+        with self._lock:
+            self._dirty = True
+            self._pending_events += 1
+            due = (
+                self._pending_events >= self._save_max_pending
+                or time.monotonic() - self._last_save_ts > self._save_interval_s
+            )
+            if not due and self._flush_timer is None:
+                timer = threading.Timer(self._save_interval_s, self.flush)
+                timer.daemon = True
+                self._flush_timer = timer
+                timer.start()
+
+        if due:
+            self.flush()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+
     def _load(self) -> None:
-        if not os.path.exists(self.path):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
             # pas grave si le fichier n'existe pas encore
             return
+        except Exception:
+            return
 
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         except Exception:
             return
 
@@ -182,23 +394,46 @@ class WalletManager:
                 enabled=bool(w.get("enabled", True)),
                 alert_on_activity=bool(w.get("alert_on_activity", True)),
                 tx_count=int(w.get("tx_count", 0)),
-                total_notional_usd=Decimal(str(w.get("total_notional_usd", "0"))),
+                total_notional_usd=float(w.get("total_notional_usd", 0) or 0),
                 last_seen_ts=w.get("last_seen_ts"),
                 last_chain=w.get("last_chain"),
             )
             self._wallets[addr] = state
 
-    def _save(self) -> None:
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        payload = {
-            "wallets": [w.to_dict() for w in self._wallets.values()],
-        }
+    def _save(self) -> bool:
+        """
+        Ecriture atomique : sérialisation en un seul buffer, écriture dans
+        un fichier temporaire voisin, fsync puis os.replace. Un crash en
+        cours d'écriture laisse l'ancien fichier intact.
+
+        Retourne True si le fichier a été écrit (jamais d'exception).
+        """
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
+            if not self._dir_ready:
+                if self._dir:
+                    os.makedirs(self._dir, exist_ok=True)
+                self._dir_ready = True
+
+            # fragments JSON par wallet, re-sérialisés seulement si modifiés
+            payload_bytes = b"".join(
+                (
+                    b'{"wallets":[',
+                    b",".join([w.to_json_bytes() for w in self._wallets.values()]),
+                    b"]}",
+                )
+            )
+
+            fd = os.open(self._tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, payload_bytes)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(self._tmp_path, self.path)
         except Exception:
             # pas d'exception qui remonte dans le bot
-            pass
+            return False
+        return True
 
     # ------------------------------------------------------------------ #
     # Utils                                                              #
@@ -208,5 +443,8 @@ class WalletManager:
     def _norm(addr: Optional[str]) -> str:
         if not addr:
             return ""
-        addr = addr.strip()
-        return addr.lower()
+        addr = addr.strip().lower()
+        # adresses internées : clés du dict partagées et comparées par identité
+        if len(addr) <= 200:
+            return sys.intern(addr)
+        return addr
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import logging
-from datetime import date, datetime
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Dict, Iterable, Optional, List
+from typing import Callable, Dict, Iterable, Optional, List, Set, Tuple, ValuesView
 
 from .models import (
     ProfitSplitRule,
@@ -19,6 +21,69 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
+# Constantes Decimal partagées : évite de re-parser "0"/"100" à chaque appel
+_D0 = Decimal(0)
+_D2 = Decimal(2)
+_D100 = Decimal(100)
+
+# Raisons de refus de evaluate_trade_request (chaînes partagées)
+_REASON_MIN_BALANCE = "Solde en dessous du minimum autorisé"
+_REASON_ZERO_NOTIONAL = "Taille max autorisée nulle (check max_risk_pct_per_trade)"
+_REASON_DAILY_LOSS = "Perte journalière max atteinte pour ce wallet"
+_REASON_TOO_LARGE = "Taille demandée > taille autorisée pour ce wallet"
+
+
+@dataclass(frozen=True, slots=True)
+class _SplitIndex:
+    """
+    Règles de profit split d'un wallet source, pré-triées par trigger_pct.
+
+    Si les k premiers triggers sont atteints, legs[k] donne les transferts
+    (target_wallet_id, target_state, pct clampé >= 0, reason) dans l'ordre de
+    config, sum_pct[k] leur somme et divisor[k] le diviseur du profit
+    (sum_pct[k] si > 100, sinon 100). target_state vaut None si la cible est
+    inconnue ou égale à la source (le transfert passe alors par _transfer).
+    """
+
+    triggers: Tuple[Decimal, ...]
+    legs: Tuple[Tuple[Tuple[str, Optional[WalletState], Decimal, str], ...], ...]
+    sum_pct: Tuple[Decimal, ...]
+    divisor: Tuple[Decimal, ...]
+
+    @classmethod
+    def build(
+        cls,
+        source_wallet_id: str,
+        rules: Iterable[ProfitSplitRule],
+        states: Dict[str, WalletState],
+    ) -> "_SplitIndex":
+        ordered = sorted(enumerate(rules), key=lambda ir: ir[1].trigger_pct)
+        legs: List[Tuple[Tuple[str, Optional[WalletState], Decimal, str], ...]] = [()]
+        sums: List[Decimal] = [_D0]
+        for k in range(1, len(ordered) + 1):
+            fired = sorted(ordered[:k], key=lambda ir: ir[0])
+            leg = tuple(
+                (
+                    r.target_wallet_id,
+                    states.get(r.target_wallet_id)
+                    if r.target_wallet_id != source_wallet_id
+                    else None,
+                    max(_D0, r.percent_of_profit),
+                    f"profit_split:{source_wallet_id}->{r.target_wallet_id}",
+                )
+                for _, r in fired
+            )
+            legs.append(leg)
+            sums.append(sum((pct for _, _, pct, _ in leg), _D0))
+        return cls(
+            triggers=tuple(r.trigger_pct for _, r in ordered),
+            legs=tuple(legs),
+            sum_pct=tuple(sums),
+            divisor=tuple(sp if sp > _D100 else _D100 for sp in sums),
+        )
+
 
 class WalletFlowsEngine:
     """
@@ -52,23 +117,102 @@ class WalletFlowsEngine:
         self._logger = logger or logging.getLogger(__name__)
         self._flows_config = flows_config
 
-        self._configs: Dict[str, WalletConfig] = {c.id: c for c in wallet_configs}
+        # Une seule passe sur les configs : configs, états runtime et baseline
+        # de profit (ProfitSplitRule) sont remplis ensemble.
+        self._configs: Dict[str, WalletConfig] = {}
+        self._states: Dict[str, WalletState] = {}
+        self._profit_baseline: Dict[str, Decimal] = {}
+        for cfg in wallet_configs:
+            wid = cfg.id
+            init_balance = cfg.initial_balance_usd
+            self._configs[wid] = cfg
+            self._states[wid] = WalletState(id=wid, balance_usd=init_balance)
+            self._profit_baseline[wid] = init_balance
         if not self._configs:
             raise ValueError("WalletFlowsEngine: aucun wallet configuré.")
 
-        # Etats runtime initialisés depuis les configs
-        self._states: Dict[str, WalletState] = {
-            wid: WalletState(id=wid, balance_usd=cfg.initial_balance_usd)
+        # Vue live sur les états (le dict n'est jamais réassigné) : évite de
+        # recréer un objet view à chaque agrégation
+        self._values_view = self._states.values()
+
+        # Compteur de génération : incrémenté à chaque mutation d'un état,
+        # permet aux consommateurs (snapshots) de détecter "rien n'a changé".
+        self._gen = 0
+
+        # Auto-fees : suivi, par jour, de ce qui a déjà été prélevé par wallet.
+        self._auto_fees_charged_today: Dict[str, Decimal] = {}
+
+        # Auto-fees : la cible (médiane de [min, max] clampée) ne dépend que de
+        # la config, on la calcule une fois plutôt qu'à chaque cycle.
+        min_pct = flows_config.min_auto_fees_pct
+        max_pct = flows_config.max_auto_fees_pct
+        if min_pct < _D0:
+            min_pct = _D0
+        if max_pct < min_pct:
+            max_pct = min_pct
+        self._auto_fees_target_pct: Decimal = (min_pct + max_pct) / _D2
+        # Fraction du PnL réalisé à prélever (target_pct / 100)
+        self._auto_fees_ratio: Decimal = self._auto_fees_target_pct / _D100
+
+        auto_wallet_id = flows_config.auto_fees_wallet_id
+        if auto_wallet_id and auto_wallet_id not in self._states:
+            self._logger.warning(
+                "WalletFlowsEngine: auto_fees_wallet_id=%s introuvable, auto-fees désactivé",
+                auto_wallet_id,
+            )
+        self._has_auto_fees: bool = bool(
+            auto_wallet_id
+            and auto_wallet_id in self._states
+            and self._auto_fees_target_pct > _D0
+        )
+
+        # Wallets sources d'auto-fees, figés depuis la config :
+        # (wallet_id, state, min_balance_usd). On ne prélève jamais sur le
+        # wallet de fees lui-même.
+        # ⚠️ Important : on ne filtre plus par rôle, seulement par allow_outflows.
+        # Cela permet de supporter les rôles de config actuels ("SCALPING",
+        # "MAIN", etc.) tout en excluant les coffres/vaults configurés avec
+        # allow_outflows=False.
+        self._auto_fees_sources: Tuple[Tuple[str, WalletState, Decimal], ...] = tuple(
+            (wid, self._states[wid], cfg.min_balance_usd)
             for wid, cfg in self._configs.items()
+            if wid != auto_wallet_id and cfg.allow_outflows
+        )
+        self._auto_fees_by_id: Dict[str, Tuple[WalletState, Decimal]] = {
+            wid: (state, min_balance)
+            for wid, state, min_balance in self._auto_fees_sources
         }
+        # Wallets sources crédités par un transfert depuis leur dernier passage
+        # auto-fees : leur surplus a augmenté, un prélèvement peut redevenir dû.
+        self._auto_fees_pending: Set[str] = set()
+
+        # Equity totale maintenue incrémentalement : les transferts internes
+        # sont neutres, seul le PnL net de register_fill la fait varier.
+        self._total_equity: Decimal = sum(
+            (s.balance_usd for s in self._states.values()), _D0
+        )
 
-        # Baseline de profit par wallet pour les ProfitSplitRule
-        self._profit_baseline: Dict[str, Decimal] = {
-            wid: cfg.initial_balance_usd for wid, cfg in self._configs.items()
+        # ProfitSplitRule validées et groupées par wallet source (config statique)
+        self._rules_by_source: Dict[str, Tuple[ProfitSplitRule, ...]] = (
+            self._build_rules_by_source()
+        )
+        # Index pré-trié par trigger (sommes/diviseurs précalculés par préfixe)
+        self._split_index: Dict[str, _SplitIndex] = {
+            wid: _SplitIndex.build(wid, rule_list, self._states)
+            for wid, rule_list in self._rules_by_source.items()
         }
 
-        # Auto-fees : suivi, par jour, de ce qui a déjà été prélevé par wallet.
-        self._auto_fees_charged_today: Dict[str, Decimal] = {}
+        # Transferts du cycle financier en cours (source, target, montant,
+        # reason), émis en un seul record INFO en fin de cycle.
+        self._transfer_log_buf: List[Tuple[str, str, Decimal, str]] = []
+
+        # Evaluateurs de risque spécialisés par wallet (evaluate_trade_request)
+        self._eval_cache: Dict[
+            str, Callable[[TradeRiskRequest], TradeRiskDecision]
+        ] = {}
+
+        # Dernier jour pour lequel le reset journalier a été appliqué
+        self._current_day: Optional[date] = None
 
         # Compounding global
         self._last_compound_at: Optional[date] = None
@@ -91,9 +235,30 @@ class WalletFlowsEngine:
     def states(self) -> Dict[str, WalletState]:
         return self._states
 
+    @property
+    def generation(self) -> int:
+        return self._gen
+
+    @property
+    def values_view(self) -> ValuesView[WalletState]:
+        return self._values_view
+
     def get_state(self, wallet_id: str) -> WalletState:
         return self._states[wallet_id]
 
+    def totals(self) -> Tuple[Decimal, Decimal, Decimal, Decimal]:
+        """
+        Agrégats globaux en une seule passe sur les états :
+        (equity, realized_pnl_today, gross_pnl_today, fees_paid_today).
+        """
+        equity = realized = gross = fees = _D0
+        for s in self._values_view:
+            equity += s.balance_usd
+            realized += s.realized_pnl_today_usd
+            gross += s.gross_pnl_today_usd
+            fees += s.fees_paid_today_usd
+        return equity, realized, gross, fees
+
     # ------------------------------------------------------------------
     # Maintenance journalière / périodique
     # ------------------------------------------------------------------
@@ -103,27 +268,36 @@ class WalletFlowsEngine:
         Reset des compteurs journaliers lorsque la date change.
         """
         today = now.date()
-        any_reset = False
+        # Fast-path : tous les wallets sont déjà alignés sur ce jour
+        if today == self._current_day:
+            return
+
+        reset_ids: List[str] = []
 
         for state in self._states.values():
             if state.last_reset_date != today:
-                any_reset = True
-                self._logger.info(
-                    "wallet.daily_reset",
-                    extra={
-                        "wallet_id": state.id,
-                        "prev_date": state.last_reset_date.isoformat(),
-                    },
-                )
+                reset_ids.append(state.id)
                 state.last_reset_date = today
-                state.realized_pnl_today_usd = Decimal("0")
-                state.fees_paid_today_usd = Decimal("0")
-                state.gross_pnl_today_usd = Decimal("0")
+                state.realized_pnl_today_usd = _D0
+                state.fees_paid_today_usd = _D0
+                state.gross_pnl_today_usd = _D0
                 state.consecutive_losing_trades = 0
+                state._snapshot_cache = None
+
+        self._current_day = today
 
         # Nouveau jour => on remet à zéro le suivi auto-fees
-        if any_reset:
+        if reset_ids:
+            self._gen += 1
             self._auto_fees_charged_today.clear()
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(
+                    "wallet.daily_reset",
+                    extra={
+                        "wallet_ids": reset_ids,
+                        "date": today.isoformat(),
+                    },
+                )
 
     def run_periodic_tasks(self, now: Optional[datetime] = None) -> None:
         """
@@ -135,7 +309,8 @@ class WalletFlowsEngine:
           - auto-fees,
           - profit splits (M4).
         """
-        now = now or datetime.utcnow()
+        # Une seule lecture d'horloge par tick, partagée par tous les hooks.
+        now = now or datetime.now(_UTC)
         self._ensure_daily_reset(now)
         self._maybe_compound(now)
         # Cycle financier global (auto-fees + profit splits + policy fees)
@@ -148,57 +323,82 @@ class WalletFlowsEngine:
     def evaluate_trade_request(self, req: TradeRiskRequest) -> TradeRiskDecision:
         """
         Vérifie si un trade est acceptable pour un wallet donné.
-        """
-        self._ensure_daily_reset(req.timestamp)
-
-        if req.wallet_id not in self._states:
-            return TradeRiskDecision(
-                approved=False,
-                max_allowed_notional_usd=Decimal("0"),
-                reason=f"Wallet inconnu: {req.wallet_id}",
-            )
 
-        cfg = self._configs[req.wallet_id]
-        state = self._states[req.wallet_id]
-
-        # 1) Solde minimum
-        if state.balance_usd <= cfg.min_balance_usd:
-            return TradeRiskDecision(
-                approved=False,
-                max_allowed_notional_usd=Decimal("0"),
-                reason="Solde en dessous du minimum autorisé",
-            )
-
-        # 2) Taille max autorisée en fonction du % de risque par trade
-        max_notional = (state.balance_usd * cfg.max_risk_pct_per_trade) / Decimal("100")
-
-        if max_notional <= Decimal("0"):
-            return TradeRiskDecision(
-                approved=False,
-                max_allowed_notional_usd=Decimal("0"),
-                reason="Taille max autorisée nulle (check max_risk_pct_per_trade)",
-            )
+        Délègue à un évaluateur spécialisé par wallet (cf. _build_evaluator),
+        construit au premier appel puis mis en cache.
+        """
+        evaluator = self._eval_cache.get(req.wallet_id)
+        if evaluator is None:
+            if req.wallet_id not in self._states:
+                self._ensure_daily_reset(req.timestamp)
+                return TradeRiskDecision(
+                    approved=False,
+                    max_allowed_notional_usd=_D0,
+                    reason=f"Wallet inconnu: {req.wallet_id}",
+                )
+            evaluator = self._build_evaluator(req.wallet_id)
+            self._eval_cache[req.wallet_id] = evaluator
+        return evaluator(req)
 
-        # 3) Limite de perte journalière pour ce wallet
-        if cfg.max_daily_loss_pct is not None and state.gross_pnl_today_usd < Decimal("0"):
-            max_daily_loss_value = (
-                state.balance_usd * cfg.max_daily_loss_pct / Decimal("100")
-            )
-            if abs(state.gross_pnl_today_usd) >= max_daily_loss_value:
+    def _build_evaluator(
+        self, wallet_id: str
+    ) -> Callable[[TradeRiskRequest], TradeRiskDecision]:
+        """
+        Construit l'évaluateur de risque d'un wallet : état, seuils de config
+        (statiques) et ratios pré-divisés par 100 sont capturés une fois.
+        """
+        state = self._states[wallet_id]
+        cfg = self._configs[wallet_id]
+        min_balance = cfg.min_balance_usd
+        risk_ratio = cfg.max_risk_pct_per_trade / _D100
+        daily_loss_ratio = (
+            None if cfg.max_daily_loss_pct is None else cfg.max_daily_loss_pct / _D100
+        )
+        ensure_daily_reset = self._ensure_daily_reset
+
+        def _evaluate(req: TradeRiskRequest) -> TradeRiskDecision:
+            ensure_daily_reset(req.timestamp)
+
+            balance = state.balance_usd
+            # Taille max autorisée en fonction du % de risque par trade
+            max_notional = balance * risk_ratio
+
+            # Checks de refus dans l'ordre de priorité ; la décision n'est
+            # construite qu'une fois, en sortie.
+            reason: Optional[str] = None
+            if balance <= min_balance:
+                # 1) Solde minimum
+                reason = _REASON_MIN_BALANCE
+            elif max_notional <= _D0:
+                # 2) Taille max nulle
+                reason = _REASON_ZERO_NOTIONAL
+            elif daily_loss_ratio is not None:
+                # 3) Limite de perte journalière pour ce wallet
+                gross = state.gross_pnl_today_usd
+                if gross < _D0 and -gross >= balance * daily_loss_ratio:
+                    reason = _REASON_DAILY_LOSS
+
+            if reason is not None:
                 return TradeRiskDecision(
                     approved=False,
-                    max_allowed_notional_usd=Decimal("0"),
-                    reason="Perte journalière max atteinte pour ce wallet",
+                    max_allowed_notional_usd=_D0,
+                    reason=reason,
                 )
 
-        approved = req.requested_notional_usd <= max_notional
-        allowed = min(req.requested_notional_usd, max_notional)
+            requested = req.requested_notional_usd
+            if requested <= max_notional:
+                return TradeRiskDecision(
+                    approved=True,
+                    max_allowed_notional_usd=requested,
+                    reason=None,
+                )
+            return TradeRiskDecision(
+                approved=False,
+                max_allowed_notional_usd=max_notional,
+                reason=_REASON_TOO_LARGE,
+            )
 
-        return TradeRiskDecision(
-            approved=approved,
-            max_allowed_notional_usd=allowed,
-            reason=None if approved else "Taille demandée > taille autorisée pour ce wallet",
-        )
+        return _evaluate
 
     # ------------------------------------------------------------------
     # Mise à jour après exécution (PnL, fees, etc.)
@@ -208,7 +408,7 @@ class WalletFlowsEngine:
         self,
         wallet_id: str,
         realized_pnl_usd: Decimal,
-        fees_paid_usd: Decimal = Decimal("0"),
+        fees_paid_usd: Decimal = _D0,
     ) -> None:
         """
         Helper compat : wrapper autour de register_fill().
@@ -226,7 +426,7 @@ class WalletFlowsEngine:
         self,
         wallet_id: str,
         realized_pnl_usd: Decimal,
-        fees_paid_usd: Decimal = Decimal("0"),
+        fees_paid_usd: Decimal = _D0,
     ) -> None:
         """
         A appeler par l'ExecutionEngine (ou un adapter) après la clôture d'une position.
@@ -235,8 +435,8 @@ class WalletFlowsEngine:
             self._logger.warning(
                 "register_fill ignoré: wallet inconnu %s (pnl=%.2f, fees=%.2f)",
                 wallet_id,
-                float(realized_pnl_usd),
-                float(fees_paid_usd),
+                realized_pnl_usd,
+                fees_paid_usd,
             )
             return
 
@@ -244,6 +444,9 @@ class WalletFlowsEngine:
 
         net_pnl = realized_pnl_usd - fees_paid_usd
         state.balance_usd += net_pnl
+        self._total_equity += net_pnl
+        state._snapshot_cache = None
+        self._gen += 1
         state.realized_pnl_today_usd += realized_pnl_usd
         state.fees_paid_today_usd += fees_paid_usd
         state.gross_pnl_today_usd += net_pnl
@@ -253,18 +456,27 @@ class WalletFlowsEngine:
         elif realized_pnl_usd > 0:
             state.consecutive_losing_trades = 0
 
-        self._logger.info(
-            "wallet.register_fill",
-            extra={
-                "wallet_id": wallet_id,
-                "realized_pnl_usd": f"{realized_pnl_usd:.2f}",
-                "fees_paid_usd": f"{fees_paid_usd:.2f}",
-                "new_balance_usd": f"{state.balance_usd:.2f}",
-            },
-        )
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(
+                "wallet.register_fill",
+                extra={
+                    "wallet_id": wallet_id,
+                    "realized_pnl_usd": f"{realized_pnl_usd:.2f}",
+                    "fees_paid_usd": f"{fees_paid_usd:.2f}",
+                    "new_balance_usd": f"{state.balance_usd:.2f}",
+                },
+            )
 
-        # Hooks financiers après mise à jour du PnL :
-        self.run_finance_cycle_for_wallet(wallet_id)
+        # Cycle financier fusionné (équivalent à run_finance_cycle_for_wallet) :
+        #   - auto-fees incrémental : seuls le wallet du fill et les wallets
+        #     crédités depuis le dernier passage peuvent avoir un prélèvement,
+        #   - profit split uniquement si le wallet a des règles,
+        #   - policy fees (l'equity totale a bougé).
+        self._rebalance_auto_fees_for_wallet(wallet_id)
+        if wallet_id in self._split_index:
+            self._apply_profit_splits_for_wallet(wallet_id)
+        self._apply_fees_policy()
+        self._flush_transfer_log(wallet_id)
 
     # ------------------------------------------------------------------
     # Hooks compounding & auto-fees / profit-splits (M4)
@@ -288,6 +500,7 @@ class WalletFlowsEngine:
         self._rebalance_auto_fees()
         self._apply_profit_splits_all()
         self._apply_fees_policy()
+        self._flush_transfer_log(None)
 
     def run_finance_cycle_for_wallet(self, wallet_id: str) -> None:
         """
@@ -303,6 +516,7 @@ class WalletFlowsEngine:
         self._rebalance_auto_fees()
         self._apply_profit_splits_for_wallet(wallet_id)
         self._apply_fees_policy()
+        self._flush_transfer_log(wallet_id)
 
     def _maybe_compound(self, now: datetime) -> None:
         """
@@ -338,85 +552,89 @@ class WalletFlowsEngine:
             vers auto_fees_wallet_id (ex: "fees"),
           - on respecte min_balance_usd pour ne jamais vider un wallet.
         """
-        auto_wallet_id = self._flows_config.auto_fees_wallet_id
-        if not auto_wallet_id:
-            return
-        if auto_wallet_id not in self._states:
-            self._logger.warning(
-                "WalletFlowsEngine._rebalance_auto_fees(): auto_fees_wallet_id=%s introuvable",
-                auto_wallet_id,
-            )
+        # Wallet de fees absent/inconnu ou target nulle : rien à prélever
+        if not self._has_auto_fees:
             return
 
-        min_pct = self._flows_config.min_auto_fees_pct
-        max_pct = self._flows_config.max_auto_fees_pct
+        self._auto_fees_pending.clear()
+        for wid, state, min_balance in self._auto_fees_sources:
+            self._charge_auto_fees(wid, state, min_balance)
 
-        if min_pct < Decimal("0"):
-            min_pct = Decimal("0")
-        if max_pct < min_pct:
-            max_pct = min_pct
+        self._logger.debug(
+            "WalletFlowsEngine._rebalance_auto_fees() — auto-fees appliqué. "
+            "auto_fees_wallet_id=%s, target_pct=%s, rules=%d",
+            self._flows_config.auto_fees_wallet_id,
+            self._auto_fees_target_pct,
+            len(self._flows_config.profit_split_rules or []),
+        )
 
-        # On prend la médiane de [min, max] comme target (conservateur)
-        target_pct = (min_pct + max_pct) / Decimal("2")
+    def _rebalance_auto_fees_for_wallet(self, wallet_id: str) -> None:
+        """
+        Auto-fees incrémental après un fill sur wallet_id.
 
-        if target_pct <= Decimal("0"):
+        Un wallet source déjà traité ne peut redevenir prélevable que si son
+        PnL réalisé augmente (fill) ou si son surplus augmente (transfert
+        entrant, cf. _auto_fees_pending) : on ne traite que ceux-là.
+        """
+        if not self._has_auto_fees:
             return
 
-        for wid, state in self._states.items():
-            # On ne prélève jamais sur le wallet de fees lui-même
-            if wid == auto_wallet_id:
-                continue
-
-            cfg = self._configs[wid]
+        pending = self._auto_fees_pending
+        pending.add(wallet_id)
+        sources = self._auto_fees_by_id
+        while pending:
+            wid = pending.pop()
+            src = sources.get(wid)
+            if src is not None:
+                self._charge_auto_fees(wid, src[0], src[1])
 
-            # ⚠️ Important : on ne filtre plus par rôle, seulement par allow_outflows.
-            # Cela permet de supporter les rôles de config actuels ("SCALPING",
-            # "MAIN", etc.) tout en excluant les coffres/vaults configurés avec
-            # allow_outflows=False.
-            if not cfg.allow_outflows:
-                continue
-
-            # Autofees uniquement si PnL réalisé positif sur la journée
-            if state.realized_pnl_today_usd <= Decimal("0"):
-                continue
-
-            # Total idéal de fees à prélever sur la journée pour ce wallet
-            ideal_total = (
-                state.realized_pnl_today_usd * target_pct / Decimal("100")
-            )
-            already = self._auto_fees_charged_today.get(wid, Decimal("0"))
-            remaining = ideal_total - already
-
-            if remaining <= Decimal("0"):
-                continue
+    def _charge_auto_fees(
+        self,
+        wid: str,
+        state: WalletState,
+        min_balance: Decimal,
+    ) -> None:
+        """
+        Prélève, pour un wallet source, la part d'auto-fees encore due sur la
+        journée, dans la limite de son surplus vs min_balance.
+        """
+        # Autofees uniquement si PnL réalisé positif sur la journée
+        realized = state.realized_pnl_today_usd
+        if realized <= _D0:
+            return
 
-            # On ne prélève que dans la limite du surplus vs min_balance
-            surplus = state.balance_usd - cfg.min_balance_usd
-            if surplus <= Decimal("0"):
-                continue
+        # Total idéal de fees à prélever sur la journée pour ce wallet
+        # (target = médiane de [min, max], précalculée en ratio)
+        ideal_total = realized * self._auto_fees_ratio
+        already = self._auto_fees_charged_today.get(wid, _D0)
+        remaining = ideal_total - already
 
-            amount = min(remaining, surplus)
-            if amount <= Decimal("0"):
-                continue
+        if remaining <= _D0:
+            return
 
-            transferred = self._transfer(
-                source_wallet_id=wid,
-                target_wallet_id=auto_wallet_id,
-                amount_usd=amount,
-                reason="auto_fees",
-            )
-            if transferred <= Decimal("0"):
-                continue
+        # On ne prélève que dans la limite du surplus vs min_balance
+        surplus = state.balance_usd - min_balance
+        if surplus <= _D0:
+            return
 
-            self._auto_fees_charged_today[wid] = already + transferred
+        amount = min(remaining, surplus)
+        if amount <= _D0:
+            return
 
-        self._logger.debug(
-            "WalletFlowsEngine._rebalance_auto_fees() — auto-fees appliqué. "
-            "auto_fees_wallet_id=%s, target_pct=%s, rules=%d",
-            auto_wallet_id,
-            str(target_pct),
-            len(self._flows_config.profit_split_rules or []),
+        auto_wallet_id = self._flows_config.auto_fees_wallet_id
+        transferred = self._move(
+            source_wallet_id=wid,
+            src_state=state,
+            min_balance=min_balance,
+            target_wallet_id=auto_wallet_id,
+            tgt_state=self._states[auto_wallet_id],
+            amount=amount,
+            reason="auto_fees",
         )
+        if transferred <= _D0:
+            return
+
+        self._auto_fees_charged_today[wid] = already + transferred
 
     def _apply_fees_policy(self) -> None:
         """
@@ -433,7 +651,7 @@ class WalletFlowsEngine:
             return
 
         max_pct = self._flows_config.fees_max_equity_pct
-        if max_pct is None or max_pct <= Decimal("0"):
+        if max_pct is None or max_pct <= _D0:
             return
 
         target_wallet_id = self._flows_config.fees_over_cap_target_wallet_id
@@ -444,8 +662,8 @@ class WalletFlowsEngine:
             )
             return
 
-        total_equity = sum(s.balance_usd for s in self._states.values())
-        if total_equity <= Decimal("0"):
+        total_equity = self._total_equity
+        if total_equity <= _D0:
             return
 
         fees_state = self._states[fees_wallet_id]
@@ -458,7 +676,7 @@ class WalletFlowsEngine:
         # On ramène le wallet de fees au cap max_pct
         cap_amount = (total_equity * max_pct)
         excess = fees_balance - cap_amount
-        if excess <= Decimal("0"):
+        if excess <= _D0:
             return
 
         transferred = self._transfer(
@@ -468,7 +686,7 @@ class WalletFlowsEngine:
             reason="fees_over_cap",
         )
 
-        if transferred > Decimal("0"):
+        if transferred > _D0 and self._logger.isEnabledFor(logging.INFO):
             self._logger.info(
                 "WalletFlowsEngine._apply_fees_policy() — sweep fees_over_cap",
                 extra={
@@ -483,17 +701,14 @@ class WalletFlowsEngine:
     # Profit splits (M4)
     # ------------------------------------------------------------------
 
-    def _apply_profit_splits_all(self) -> None:
+    def _build_rules_by_source(self) -> Dict[str, Tuple[ProfitSplitRule, ...]]:
         """
-        Applique les ProfitSplitRule pour tous les wallets.
+        Valide les ProfitSplitRule (source/target connus) et les groupe par
+        wallet source. Appelé une fois à l'init : la config est statique.
         """
-        rules = self._flows_config.profit_split_rules or []
-        if not rules:
-            return
-
         rules_by_source: Dict[str, List[ProfitSplitRule]] = {}
 
-        for rule in rules:
+        for rule in self._flows_config.profit_split_rules or []:
             if rule.source_wallet_id not in self._states:
                 self._logger.warning(
                     "ProfitSplitRule ignorée: source_wallet_id=%s introuvable",
@@ -508,8 +723,14 @@ class WalletFlowsEngine:
                 continue
             rules_by_source.setdefault(rule.source_wallet_id, []).append(rule)
 
-        for source_wallet_id, rule_list in rules_by_source.items():
-            self._apply_profit_splits_for_wallet(source_wallet_id, rule_list)
+        return {wid: tuple(rule_list) for wid, rule_list in rules_by_source.items()}
+
+    def _apply_profit_splits_all(self) -> None:
+        """
+        Applique les ProfitSplitRule pour tous les wallets.
+        """
+        for source_wallet_id in self._rules_by_source:
+            self._apply_profit_splits_for_wallet(source_wallet_id)
 
     def _apply_profit_splits_for_wallet(
         self,
@@ -529,77 +750,86 @@ class WalletFlowsEngine:
             return
 
         if rules is None:
-            rules = [
-                r
-                for r in (self._flows_config.profit_split_rules or [])
-                if r.source_wallet_id == wallet_id
-                and r.target_wallet_id in self._states
-            ]
-
-        rule_list = list(rules)
-        if not rule_list:
-            return
+            index = self._split_index.get(wallet_id)
+            if index is None:
+                return
+        else:
+            rule_list = tuple(rules)
+            if not rule_list:
+                return
+            index = _SplitIndex.build(wallet_id, rule_list, self._states)
+        min_trigger = index.triggers[0]
 
         base = self._profit_baseline.get(wallet_id, cfg.initial_balance_usd)
         current_balance = state.balance_usd
 
         profit_since_base = current_balance - base
-        if profit_since_base <= Decimal("0"):
+        if profit_since_base <= _D0:
             return
 
-        if base > Decimal("0"):
-            profit_pct = (profit_since_base / base) * Decimal("100")
+        # Fast-fail : profit_pct < min_trigger <=> profit * 100 < min_trigger * base
+        if base > _D0:
+            if profit_since_base * _D100 < min_trigger * base:
+                return
+            profit_pct = (profit_since_base / base) * _D100
         else:
-            profit_pct = Decimal("0")
+            if min_trigger > _D0:
+                return
+            profit_pct = _D0
 
-        eligible_rules: List[ProfitSplitRule] = [
-            r for r in rule_list if profit_pct >= r.trigger_pct
-        ]
-        if not eligible_rules:
+        # Nombre de règles déclenchées (triggers triés => préfixe)
+        k = bisect_right(index.triggers, profit_pct)
+        if k == 0 or index.sum_pct[k] <= _D0:
             return
 
-        sum_pct = sum(
-            max(Decimal("0"), r.percent_of_profit) for r in eligible_rules
-        )
-        if sum_pct <= Decimal("0"):
-            return
+        # Facteur commun (profit * scale / 100) : si la somme dépasse 100%,
+        # on ramène à 100% du profit.
+        unit = profit_since_base / index.divisor[k]
 
-        scale = Decimal("1")
-        if sum_pct > Decimal("100"):
-            scale = Decimal("100") / sum_pct
+        total_transferred = _D0
+        min_balance = cfg.min_balance_usd
 
-        total_transferred = Decimal("0")
-
-        for r in eligible_rules:
-            rule_pct = max(Decimal("0"), r.percent_of_profit) * scale
-            amount = profit_since_base * rule_pct / Decimal("100")
-            if amount <= Decimal("0"):
+        for target_wallet_id, tgt_state, pct, reason in index.legs[k]:
+            amount = pct * unit
+            if amount <= _D0:
                 continue
 
-            transferred = self._transfer(
-                source_wallet_id=wallet_id,
-                target_wallet_id=r.target_wallet_id,
-                amount_usd=amount,
-                reason=f"profit_split:{wallet_id}->{r.target_wallet_id}",
-            )
-            if transferred > Decimal("0"):
+            if tgt_state is None:
+                transferred = self._transfer(
+                    source_wallet_id=wallet_id,
+                    target_wallet_id=target_wallet_id,
+                    amount_usd=amount,
+                    reason=reason,
+                )
+            else:
+                transferred = self._move(
+                    source_wallet_id=wallet_id,
+                    src_state=state,
+                    min_balance=min_balance,
+                    target_wallet_id=target_wallet_id,
+                    tgt_state=tgt_state,
+                    amount=amount,
+                    reason=reason,
+                )
+            if transferred > _D0:
                 total_transferred += transferred
 
-        if total_transferred <= Decimal("0"):
+        if total_transferred <= _D0:
             return
 
         self._profit_baseline[wallet_id] = base + profit_since_base
 
-        self._logger.info(
-            "wallet.profit_split",
-            extra={
-                "wallet_id": wallet_id,
-                "profit_since_base_usd": f"{profit_since_base:.2f}",
-                "profit_pct_since_base": f"{profit_pct:.2f}",
-                "total_transferred_usd": f"{total_transferred:.2f}",
-                "rules_applied": len(eligible_rules),
-            },
-        )
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(
+                "wallet.profit_split",
+                extra={
+                    "wallet_id": wallet_id,
+                    "profit_since_base_usd": f"{profit_since_base:.2f}",
+                    "profit_pct_since_base": f"{profit_pct:.2f}",
+                    "total_transferred_usd": f"{total_transferred:.2f}",
+                    "rules_applied": k,
+                },
+            )
 
     # ------------------------------------------------------------------
     # Utils (transferts & snapshots)
@@ -614,23 +844,27 @@ class WalletFlowsEngine:
     ) -> Decimal:
         """
         Transfert interne sécurisé entre deux wallets logiques.
+
+        Point d'entrée par ids : valide les wallets et les outflows puis
+        délègue à _move. Les boucles internes qui ont déjà états et
+        min_balance en main appellent _move directement.
         """
-        amount = Decimal(amount_usd)
+        amount = amount_usd if isinstance(amount_usd, Decimal) else Decimal(amount_usd)
 
-        if amount <= Decimal("0"):
-            return Decimal("0")
+        if amount <= _D0:
+            return _D0
 
         if source_wallet_id == target_wallet_id:
-            return Decimal("0")
+            return _D0
 
         if source_wallet_id not in self._states or target_wallet_id not in self._states:
             self._logger.warning(
                 "wallet.transfer ignoré: source=%s ou target=%s inconnu (amount=%.2f)",
                 source_wallet_id,
                 target_wallet_id,
-                float(amount),
+                amount,
             )
-            return Decimal("0")
+            return _D0
 
         src_cfg = self._configs[source_wallet_id]
         if not src_cfg.allow_outflows:
@@ -638,43 +872,102 @@ class WalletFlowsEngine:
                 "wallet.transfer interdit: wallet source %s n'autorise pas les outflows.",
                 source_wallet_id,
             )
-            return Decimal("0")
-
-        src_state = self._states[source_wallet_id]
-        tgt_state = self._states[target_wallet_id]
+            return _D0
+
+        return self._move(
+            source_wallet_id,
+            self._states[source_wallet_id],
+            src_cfg.min_balance_usd,
+            target_wallet_id,
+            self._states[target_wallet_id],
+            amount,
+            reason,
+        )
 
-        surplus = src_state.balance_usd - src_cfg.min_balance_usd
-        if surplus <= Decimal("0"):
+    def _move(
+        self,
+        source_wallet_id: str,
+        src_state: WalletState,
+        min_balance: Decimal,
+        target_wallet_id: str,
+        tgt_state: WalletState,
+        amount: Decimal,
+        reason: str,
+    ) -> Decimal:
+        """
+        Cœur du transfert, sans revalidation : le caller garantit que les deux
+        wallets existent et sont distincts, que la source autorise les
+        outflows et que amount > 0. Borné au surplus vs min_balance.
+        """
+        surplus = src_state.balance_usd - min_balance
+        if surplus <= _D0:
             self._logger.debug(
                 "wallet.transfer impossible: aucun surplus sur %s "
                 "(balance=%.2f, min_balance=%.2f)",
                 source_wallet_id,
-                float(src_state.balance_usd),
-                float(src_cfg.min_balance_usd),
+                src_state.balance_usd,
+                min_balance,
             )
-            return Decimal("0")
+            return _D0
 
         effective = min(amount, surplus)
-        if effective <= Decimal("0"):
-            return Decimal("0")
+        if effective <= _D0:
+            return _D0
 
         src_state.balance_usd -= effective
         tgt_state.balance_usd += effective
-
-        self._logger.info(
-            "wallet.transfer",
-            extra={
-                "source_wallet_id": source_wallet_id,
-                "target_wallet_id": target_wallet_id,
-                "amount_usd": f"{effective:.2f}",
-                "reason": reason or "n/a",
-                "source_balance_after": f"{src_state.balance_usd:.2f}",
-                "target_balance_after": f"{tgt_state.balance_usd:.2f}",
-            },
+        src_state._snapshot_cache = None
+        tgt_state._snapshot_cache = None
+        self._gen += 1
+        if target_wallet_id in self._auto_fees_by_id:
+            self._auto_fees_pending.add(target_wallet_id)
+
+        # Détail par transfert en DEBUG ; le résumé INFO est émis par
+        # _flush_transfer_log en fin de cycle.
+        self._transfer_log_buf.append(
+            (source_wallet_id, target_wallet_id, effective, reason or "n/a")
         )
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(
+                "wallet.transfer",
+                extra={
+                    "source_wallet_id": source_wallet_id,
+                    "target_wallet_id": target_wallet_id,
+                    "amount_usd": f"{effective:.2f}",
+                    "reason": reason or "n/a",
+                    "source_balance_after": f"{src_state.balance_usd:.2f}",
+                    "target_balance_after": f"{tgt_state.balance_usd:.2f}",
+                },
+            )
 
         return effective
 
+    def _flush_transfer_log(self, wallet_id: Optional[str]) -> None:
+        """
+        Emet un unique record INFO "wallet.finance_cycle" résumant les
+        transferts du cycle (wallet_id=None pour un cycle global).
+        """
+        buf = self._transfer_log_buf
+        if not buf:
+            return
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(
+                "wallet.finance_cycle",
+                extra={
+                    "wallet_id": wallet_id or "all",
+                    "transfers": [
+                        {
+                            "source_wallet_id": src,
+                            "target_wallet_id": tgt,
+                            "amount_usd": f"{amount:.2f}",
+                            "reason": reason,
+                        }
+                        for src, tgt, amount, reason in buf
+                    ],
+                },
+            )
+        buf.clear()
+
     def debug_snapshot(self) -> Dict[str, Dict[str, str]]:
         """
         Retourne un snapshot lisible des wallets pour debug / monitoring.
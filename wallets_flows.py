@@ -6,7 +6,7 @@ import logging
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
-from .manager import WalletManager, WalletRole, WalletConfig, WalletState
+from .manager import WalletManager, WalletConfig, WalletState
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class TransferPlan:
     """
     Représente un plan de transfert interne entre wallets (en USD notionnel).
@@ -92,37 +92,34 @@ class WalletFlowManager:
         """
         plans: List[TransferPlan] = []
 
-        for name, cfg in self._wm._wallets_config.items():
-            state = self._wm.get_wallet_state(name)
+        # Bindings locaux pour la boucle
+        wm = self._wm
+        norm = WalletManager._normalize_chain
+        get_for_chain = wm.get_wallet_for_chain
+        get_state = wm.get_wallet_state
+        min_p = self.min_profit_to_sweep_usd
+        frac = self.sweep_fraction
+
+        # Vue pré-filtrée : wallets actifs avec un rôle de trading
+        for name, cfg in wm.trading_wallets():
+            state = get_state(name)
             if not state:
                 continue
 
-            if not cfg.risk.enabled:
-                continue
-
-            # On ne sweep que certains rôles (trading-ish)
-            if cfg.role not in (
-                WalletRole.MAIN,
-                WalletRole.SCALPING,
-                WalletRole.COPYTRADING,
-                WalletRole.SWING,
-                WalletRole.TEST,
-            ):
-                continue
-
             pnl = float(state.daily_pnl_usd)
-            if pnl <= self.min_profit_to_sweep_usd:
+            if pnl <= min_p:
                 continue
 
-            sweep_amount = pnl * self.sweep_fraction
+            sweep_amount = pnl * frac
             if sweep_amount <= 0:
                 continue
 
             # Trouver wallet de profits/vault pour la même chain
-            chain_norm = WalletManager._normalize_chain(cfg.chain)
-            profit_wallet = self._wm.get_wallet_for_chain(chain_norm, purpose="profits")
+            chain_norm = norm(cfg.chain)
+            # get_wallet_for_chain mémoïse déjà (chain, purpose) dans le WalletManager
+            profit_wallet = get_for_chain(chain_norm, purpose="profits")
             if not profit_wallet or profit_wallet == name:
-                profit_wallet = self._wm.get_wallet_for_chain(chain_norm, purpose="vault")
+                profit_wallet = get_for_chain(chain_norm, purpose="vault")
 
             if not profit_wallet or profit_wallet == name:
                 logger.info(
@@ -140,7 +137,7 @@ class WalletFlowManager:
                 reason="daily_profit_sweep",
                 meta={
                     "daily_pnl_usd": pnl,
-                    "sweep_fraction": self.sweep_fraction,
+                    "sweep_fraction": frac,
                 },
             )
             plans.append(plan)
@@ -6,7 +6,7 @@ import logging
 import os
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +29,18 @@ class WalletRole(str, Enum):
     BACKUP = "BACKUP"          # Secours / réserve
 
 
+# Rôles "trading" (éligibles aux sweeps de profits journaliers, cf. flows)
+TRADING_ROLES = frozenset(
+    {
+        WalletRole.MAIN,
+        WalletRole.SCALPING,
+        WalletRole.COPYTRADING,
+        WalletRole.SWING,
+        WalletRole.TEST,
+    }
+)
+
+
 @dataclass
 class WalletRiskLimits:
     """
@@ -139,6 +151,13 @@ class WalletManager:
         # }
         self._wallet_roles_cfg: Dict[str, Any] = wallet_roles or {}
 
+        # Vues pré-filtrées, reconstruites à la demande (cf. invalidate_caches)
+        self._trading_wallets: Optional[List[Tuple[str, WalletConfig]]] = None
+        # Index secondaire chain normalisée -> wallets (ordre de la config)
+        self._by_chain: Optional[Dict[Optional[str], List[WalletConfig]]] = None
+        # Résultats de get_wallet_for_chain par (chain, purpose)
+        self._route_cache: Dict[Tuple[str, str], Optional[str]] = {}
+
         logger.info(
             "[WalletManager] Initialisé avec %d wallets: %s",
             len(wallets),
@@ -214,6 +233,37 @@ class WalletManager:
     def get_wallet_state(self, name: str) -> Optional[WalletState]:
         return self._wallets_state.get(name)
 
+    def trading_wallets(self) -> List[Tuple[str, WalletConfig]]:
+        """
+        Wallets actifs (risk.enabled) ayant un rôle de trading.
+        Liste mise en cache : appeler invalidate_caches() après modification
+        d'une WalletConfig (rôle, risk.enabled, ...).
+        """
+        tw = self._trading_wallets
+        if tw is None:
+            tw = [
+                (name, cfg)
+                for name, cfg in self._wallets_config.items()
+                if cfg.risk.enabled and cfg.role in TRADING_ROLES
+            ]
+            self._trading_wallets = tw
+        return tw
+
+    def invalidate_caches(self) -> None:
+        """A appeler si la config des wallets est modifiée à chaud."""
+        self._trading_wallets = None
+        self._by_chain = None
+        self._route_cache.clear()
+
+    def _wallets_on_chain(self, chain_norm: Optional[str]) -> List[WalletConfig]:
+        idx = self._by_chain
+        if idx is None:
+            idx = {}
+            for w in self._wallets_config.values():
+                idx.setdefault(self._normalize_chain(w.chain), []).append(w)
+            self._by_chain = idx
+        return idx.get(chain_norm, [])
+
     # ----------------------------------------------------------------------
     # Gestion des clés privées
     # ----------------------------------------------------------------------
@@ -262,10 +312,7 @@ class WalletManager:
 
         chain_norm = self._normalize_chain(chain)
 
-        candidates: List[WalletConfig] = [
-            w for w in self._wallets_config.values()
-            if self._normalize_chain(w.chain) == chain_norm
-        ]
+        candidates: List[WalletConfig] = self._wallets_on_chain(chain_norm)
 
         if prefer_role:
             candidates = [w for w in candidates if w.role == prefer_role]
@@ -425,7 +472,24 @@ class WalletManager:
         Priorité:
         1) config["wallet_roles"] si présente (routing explicite)
         2) heuristiques basées sur les WalletRole
+
+        Le résultat ne dépend que de la config : il est mis en cache par
+        (chain, purpose) jusqu'au prochain invalidate_caches().
         """
+        key = (chain, purpose)
+        try:
+            return self._route_cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # chain / purpose non hashables : pas de cache
+            return self._resolve_wallet_for_chain(chain, purpose)
+
+        name = self._resolve_wallet_for_chain(chain, purpose)
+        self._route_cache[key] = name
+        return name
+
+    def _resolve_wallet_for_chain(self, chain: str, purpose: str) -> Optional[str]:
         # 1) Routing explicite via config["wallet_roles"] si disponible
         via_roles = self._route_via_wallet_roles(chain, purpose)
         if via_roles:
@@ -437,9 +501,7 @@ class WalletManager:
 
         # Filtre par chain + risk.enabled
         candidates: List[WalletConfig] = [
-            w
-            for w in self._wallets_config.values()
-            if self._normalize_chain(w.chain) == c and w.risk.enabled
+            w for w in self._wallets_on_chain(c) if w.risk.enabled
         ]
 
         if not candidates:
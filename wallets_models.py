@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 # ============================================================================
 # Enums
@@ -73,7 +73,7 @@ class WalletRole(str, Enum):
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class ProfitSplitRule:
     """
     Règle de repartition de profits entre wallets logiques.
@@ -90,7 +90,7 @@ class ProfitSplitRule:
     percent_of_profit: Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletConfig:
     """
     Configuration statique d'un wallet logique (W0–W9) issue de
@@ -115,7 +115,7 @@ class WalletConfig:
     is_auto_fees_target: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletFlowsConfig:
     """
     Configuration globale des flux entre wallets logiques.
@@ -147,7 +147,7 @@ class WalletFlowsConfig:
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletState:
     """
     Etat runtime d'un wallet logique.
@@ -165,6 +165,12 @@ class WalletState:
     fees_paid_today_usd: Decimal = Decimal("0")
     consecutive_losing_trades: int = 0
 
+    # Entrée snapshot (valeurs déjà converties en str) ; remise à None par
+    # l'engine à chaque mutation de l'état.
+    _snapshot_cache: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
 
 @dataclass
 class TradeRiskRequest:
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timezone
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+try:  # encodeur JSON en C, optionnel
+    import orjson
+except ImportError:  # pragma: no cover - fallback stdlib
+    orjson = None  # type: ignore[assignment]
 
 from .factory import build_wallet_engine_from_config
 from .engine import WalletFlowsEngine
@@ -24,12 +36,109 @@ BASE_DIR: Path = Path(__file__).resolve().parents[2]
 DATA_DIR: Path = BASE_DIR / "data" / "godmode"
 RUNTIME_WALLETS_PATH: Path = DATA_DIR / "wallets_runtime.json"
 
+# Chemins pré-calculés (str) pour l'écriture atomique tmp + os.replace
+_FINAL_PATH: str = str(RUNTIME_WALLETS_PATH)
+_TMP_PATH: str = _FINAL_PATH + ".tmp"
+
+
+# Cache opt-in des engines construits, clé = hash du contenu de la config.
+# Utile avec un hot-reload qui relit souvent une config inchangée.
+_ENGINE_CACHE: "OrderedDict[str, WalletFlowsEngine]" = OrderedDict()
+_ENGINE_CACHE_MAX = 4
+
+
+def _config_key(raw_cfg: Dict[str, Any]) -> str:
+    blob = json.dumps(raw_cfg, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _sum_wallets_field(
+    wallets: Any, key: str, *, legacy_scalar: bool = False
+) -> Decimal:
+    """
+    Somme d'un champ sur les wallets d'un snapshot fichier. Avec
+    legacy_scalar, une entrée non-dict (ancien format float) compte telle quelle.
+    """
+    if not isinstance(wallets, dict):
+        return Decimal("0")
+    total = Decimal("0")
+    for w in wallets.values():
+        if isinstance(w, dict):
+            total += _safe_decimal(w.get(key))
+        elif legacy_scalar:
+            total += _safe_decimal(w)
+    return total
+
+
+def _snapshot_digest(snapshot: Dict[str, Any]) -> bytes:
+    """Empreinte du contenu du snapshot, hors horodatage `updated_at`."""
+    content = sorted(
+        (k, v) for k, v in snapshot.items() if k != "updated_at"
+    )
+    return hashlib.blake2b(repr(content).encode("utf-8"), digest_size=16).digest()
+
+
+def _orjson_default(o: Any) -> Any:
+    if isinstance(o, Decimal):
+        return str(o)
+    raise TypeError
+
+
+def _dumps_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                snapshot, option=orjson.OPT_INDENT_2, default=_orjson_default
+            )
+        except TypeError:
+            # type exotique : on retombe sur json + default=str
+            pass
+    return json.dumps(
+        snapshot,
+        ensure_ascii=False,
+        indent=2,
+        default=str,
+    ).encode("utf-8")
+
+
+def _wallet_entry(state: WalletState) -> Dict[str, Any]:
+    """
+    Entrée snapshot d'un wallet. Les conversions str() sont mises en cache
+    sur l'état et invalidées par l'engine à chaque mutation.
+    """
+    entry = state._snapshot_cache
+    if entry is None:
+        entry = {
+            "balance_usd": str(state.balance_usd),
+            "realized_pnl_today_usd": str(state.realized_pnl_today_usd),
+            "gross_pnl_today_usd": str(state.gross_pnl_today_usd),
+            "fees_paid_today_usd": str(state.fees_paid_today_usd),
+            "consecutive_losing_trades": int(state.consecutive_losing_trades),
+            "last_reset_date": state.last_reset_date.isoformat()
+            if state.last_reset_date
+            else None,
+        }
+        state._snapshot_cache = entry
+    return entry
+
+
+# Dernier horodatage ISO formaté, réutilisé pendant la même seconde
+_ISO_CACHE: Tuple[int, str] = (-1, "")
+
 
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    global _ISO_CACHE
+    sec = int(time.time())
+    cached_sec, iso = _ISO_CACHE
+    if sec != cached_sec:
+        iso = datetime.fromtimestamp(sec, timezone.utc).isoformat()
+        _ISO_CACHE = (sec, iso)
+    return iso
 
 
 def _safe_float(x: Any) -> float:
+    if type(x) is float:
+        return x
     try:
         return float(x)
     except Exception:
@@ -37,12 +146,107 @@ def _safe_float(x: Any) -> float:
 
 
 def _safe_decimal(x: Any) -> Decimal:
+    # fast paths : pas d'aller-retour str() pour Decimal / int
+    if isinstance(x, Decimal):
+        return x
+    if isinstance(x, int) and not isinstance(x, bool):
+        return Decimal(x)
     try:
         return Decimal(str(x))
     except Exception:
         return Decimal("0")
 
 
+# ---------------------------------------------------------------------------
+# Writer de snapshots partagé (un thread pour tous les RuntimeWalletManager)
+# ---------------------------------------------------------------------------
+
+
+class _SnapshotWriter:
+    """
+    Thread d'écriture unique pour tous les managers du process.
+
+    Les snapshots en attente sont indexés par chemin de destination : un
+    snapshot plus récent pour le même fichier remplace l'ancien avant même
+    d'être écrit ("keep newest").
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._pending: Dict[
+            str, Tuple["RuntimeWalletManager", Dict[str, Any], bytes, Optional[int]]
+        ] = {}
+        self._writing = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        key: str,
+        mgr: "RuntimeWalletManager",
+        snapshot: Dict[str, Any],
+        h: bytes,
+        gen: Optional[int],
+    ) -> None:
+        with self._cond:
+            self._pending[key] = (mgr, snapshot, h, gen)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="RuntimeWalletManager-writer",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def wait_idle(self) -> None:
+        """Bloque jusqu'à ce que plus aucune écriture ne soit en attente."""
+        with self._cond:
+            while self._pending or self._writing:
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                _key, (mgr, snapshot, h, gen) = self._pending.popitem()
+                self._writing += 1
+            try:
+                mgr._write_file(snapshot, h, gen)
+            except Exception:
+                mgr._logger.exception(
+                    "RuntimeWalletManager: échec écriture snapshot (thread writer)."
+                )
+            finally:
+                with self._cond:
+                    self._writing -= 1
+                    self._cond.notify_all()
+
+
+_WRITER = _SnapshotWriter()
+# Thread daemon : on vide la file avant la fin du process
+atexit.register(_WRITER.wait_idle)
+
+# Managers vivants : le debounce peut laisser un état "dirty" non écrit
+# (derniers trades d'une rafale), on le flush à la sortie du process.
+_MANAGERS: "weakref.WeakSet[RuntimeWalletManager]" = weakref.WeakSet()
+
+
+def _flush_managers_at_exit() -> None:
+    for mgr in list(_MANAGERS):
+        if not mgr._dirty:
+            continue
+        try:
+            mgr.flush()
+        except Exception:
+            mgr._logger.exception(
+                "RuntimeWalletManager: échec flush du snapshot à la sortie."
+            )
+
+
+atexit.register(_flush_managers_at_exit)
+
+
 # ---------------------------------------------------------------------------
 # RuntimeWalletManager
 # ---------------------------------------------------------------------------
@@ -70,11 +274,46 @@ class RuntimeWalletManager:
         *,
         profile_id: str = "LIVE_150",
         logger_: Optional[logging.Logger] = None,
+        snapshot_interval_s: float = 1.0,
+        async_writes: bool = True,
+        durable_snapshots: bool = False,
     ) -> None:
         self._engine: Optional[WalletFlowsEngine] = engine
         self._profile_id = profile_id or "LIVE_150"
         self._logger = logger_ or logging.getLogger("RuntimeWalletManager")
         self._last_snapshot: Dict[str, Any] = {}
+        # empreinte du dernier snapshot écrit (skip si contenu inchangé)
+        self._last_hash: Optional[bytes] = None
+        self._last_updated_at: Optional[str] = None
+        # génération engine du dernier snapshot construit (skip si inchangée)
+        self._last_gen: Optional[int] = None
+
+        # Sérialise les accès à l'engine (non thread-safe) : on_trade_closed
+        # peut venir d'un autre thread que le tick (ExecutionEngine en mode
+        # async_wallet_updates).
+        self._engine_lock = threading.RLock()
+
+        # Debounce des écritures : les events marquent "dirty", l'écriture
+        # a lieu au plus toutes les snapshot_interval_s secondes.
+        self._snapshot_interval_s = max(float(snapshot_interval_s), 0.0)
+        self._dirty = False
+        self._last_flush_ts = 0.0
+
+        # Ecriture disque déportée dans le writer partagé du module (_WRITER)
+        self._async_writes = bool(async_writes)
+        # fsync du fichier tmp avant rename (off par défaut : compta paper)
+        self._durable_snapshots = bool(durable_snapshots)
+
+        # Dossier data créé une seule fois (et non à chaque écriture)
+        try:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            self._logger.warning(
+                "RuntimeWalletManager: impossible de créer %s.", DATA_DIR
+            )
+
+        # Mode dégradé : contenu parsé du fichier existant, clé = st_mtime_ns
+        self._fallback_cache: Optional[Tuple[int, Dict[str, Any]]] = None
 
         if self._engine is None:
             self._logger.warning(
@@ -88,15 +327,26 @@ class RuntimeWalletManager:
                 self._profile_id,
             )
 
+        # Snapshot toujours disponible pour les getters (jamais de rebuild
+        # à la volée depuis get_total_equity_usd / get_global_pnl_today_usd)
+        self._last_snapshot = self._build_snapshot()
+
+        _MANAGERS.add(self)
+
     @classmethod
     def from_config(
         cls,
         raw_cfg: Dict[str, Any],
         *,
         logger: Optional[logging.Logger] = None,
+        reuse_engine: bool = False,
     ) -> "RuntimeWalletManager":
         """
         Construit un RuntimeWalletManager depuis la config complète.
+
+        reuse_engine=True : si une config au contenu identique a déjà été
+        construite, réutilise le même WalletFlowsEngine (et donc son état
+        mutable) au lieu d'en reconstruire un.
         """
 
         log = logger or logging.getLogger("RuntimeWalletManager")
@@ -109,9 +359,25 @@ class RuntimeWalletManager:
             or "LIVE_150"
         )
 
-        engine: Optional[WalletFlowsEngine]
+        engine: Optional[WalletFlowsEngine] = None
+        key: Optional[str] = None
+        if reuse_engine:
+            try:
+                key = _config_key(raw_cfg)
+            except Exception:
+                key = None
+            if key is not None:
+                engine = _ENGINE_CACHE.get(key)
+                if engine is not None:
+                    _ENGINE_CACHE.move_to_end(key)
+
         try:
-            engine = build_wallet_engine_from_config(raw_cfg, logger=log)
+            if engine is None:
+                engine = build_wallet_engine_from_config(raw_cfg, logger=log)
+                if key is not None:
+                    _ENGINE_CACHE[key] = engine
+                    while len(_ENGINE_CACHE) > _ENGINE_CACHE_MAX:
+                        _ENGINE_CACHE.popitem(last=False)
         except Exception as exc:
             log.exception(
                 "RuntimeWalletManager.from_config: impossible de construire "
@@ -124,7 +390,7 @@ class RuntimeWalletManager:
 
         # Snapshot initial dès l'init (si engine OK)
         try:
-            mgr._write_snapshot()
+            mgr.flush()
         except Exception:
             log.exception(
                 "RuntimeWalletManager.from_config: échec écriture snapshot initial."
@@ -170,13 +436,18 @@ class RuntimeWalletManager:
     def on_tick(self) -> None:
         """Tick périodique (appelé par BotRuntime)."""
         if self._engine is None:
+            # mode dégradé : on rafraîchit le snapshot fichier une fois par
+            # tick (relecture seulement si le mtime a changé)
+            self._last_snapshot = self._build_snapshot()
             self._logger.debug("RuntimeWalletManager.on_tick: engine=None, skip.")
             return
 
         try:
-            # Reset journalier + hooks finance (auto-fees, profit splits, caps…)
-            self._engine.run_periodic_tasks()
-            self._write_snapshot()
+            with self._engine_lock:
+                # Reset journalier + hooks finance (auto-fees, profit splits, caps…)
+                self._engine.run_periodic_tasks(datetime.now(timezone.utc))
+                self._dirty = True
+                self._maybe_flush()
         except Exception as exc:
             self._logger.exception(
                 "RuntimeWalletManager.on_tick: erreur lors du tick finance (%s).",
@@ -202,12 +473,14 @@ class RuntimeWalletManager:
             return
 
         try:
-            self._engine.apply_realized_pnl(
-                wallet_id=wallet_id,
-                realized_pnl_usd=realized_pnl_usd,
-                fees_paid_usd=fees_paid_usd,
-            )
-            self._write_snapshot()
+            with self._engine_lock:
+                self._engine.apply_realized_pnl(
+                    wallet_id=wallet_id,
+                    realized_pnl_usd=realized_pnl_usd,
+                    fees_paid_usd=fees_paid_usd,
+                )
+                self._dirty = True
+                self._maybe_flush()
         except Exception as exc:
             self._logger.exception(
                 "RuntimeWalletManager.on_trade_closed: erreur lors de la "
@@ -227,56 +500,31 @@ class RuntimeWalletManager:
         Equity globale actuelle (somme des balances de tous les wallets).
         """
         if self._engine is not None:
-            total = Decimal("0")
-            for state in self._engine.states.values():
-                total += state.balance_usd
-            return total
-
-        snap = self._last_snapshot or self._build_snapshot()
-        wallets = snap.get("wallets") or {}
-        total = Decimal("0")
-        if isinstance(wallets, dict):
-            for w in wallets.values():
-                # w peut être dict ou float (format legacy)
-                if isinstance(w, dict):
-                    bal = w.get("balance_usd")
-                    total += _safe_decimal(bal)
-                else:
-                    total += _safe_decimal(w)
-        else:
-            total = _safe_decimal(snap.get("equity_total_usd", 0.0))
+            # un seul champ utile : pas besoin des 4 agrégats de totals()
+            return sum(
+                (s.balance_usd for s in self._engine.values_view), Decimal("0")
+            )
 
-        return total
+        # agrégat top-level déjà calculé par _build_snapshot
+        return _safe_decimal(self._last_snapshot.get("equity_total_usd", 0.0))
 
     def get_global_pnl_today_usd(self) -> Decimal:
         """
         PnL global du jour (tous wallets confondus), en USD.
         """
         if self._engine is not None:
-            total = Decimal("0")
-            for state in self._engine.states.values():
-                total += state.gross_pnl_today_usd
-            return total
-
-        snap = self._last_snapshot or self._build_snapshot()
-
-        if "pnl_today_total_usd" in snap:
-            return _safe_decimal(snap.get("pnl_today_total_usd", 0.0))
+            return sum(
+                (s.gross_pnl_today_usd for s in self._engine.values_view),
+                Decimal("0"),
+            )
 
-        wallets = snap.get("wallets") or {}
-        total = Decimal("0")
-        if isinstance(wallets, dict):
-            for w in wallets.values():
-                if isinstance(w, dict):
-                    pnl = w.get("gross_pnl_today_usd")
-                    total += _safe_decimal(pnl)
-        return total
+        return _safe_decimal(self._last_snapshot.get("pnl_today_total_usd", 0.0))
 
     # ------------------------------------------------------------------
     # Construction snapshot wallets_runtime.json
     # ------------------------------------------------------------------
 
-    def _build_snapshot_from_engine(self) -> Dict[str, Any]:
+    def _build_snapshot_from_engine(self, *, stamp: bool = True) -> Dict[str, Any]:
         """
         Snapshot complet à partir du WalletFlowsEngine.
 
@@ -287,42 +535,28 @@ class RuntimeWalletManager:
         assert self._engine is not None
 
         states: Dict[str, WalletState] = self._engine.states
-        wallets: Dict[str, Any] = {}
-
-        equity_total = Decimal("0")
-        realized_total = Decimal("0")
-        gross_total = Decimal("0")
-        fees_total = Decimal("0")
-
-        for wid, state in states.items():
-            equity_total += state.balance_usd
-            realized_total += state.realized_pnl_today_usd
-            gross_total += state.gross_pnl_today_usd
-            fees_total += state.fees_paid_today_usd
-
-            wallets[wid] = {
-                "balance_usd": str(state.balance_usd),
-                "realized_pnl_today_usd": str(state.realized_pnl_today_usd),
-                "gross_pnl_today_usd": str(state.gross_pnl_today_usd),
-                "fees_paid_today_usd": str(state.fees_paid_today_usd),
-                "consecutive_losing_trades": int(state.consecutive_losing_trades),
-                "last_reset_date": state.last_reset_date.isoformat()
-                if state.last_reset_date
-                else None,
-            }
+        # copie du dict en cache (copie de table de hash, pas de reconstruction
+        # clé par clé) : le snapshot publié ne partage rien avec le cache
+        wallets: Dict[str, Any] = {
+            wid: _wallet_entry(state).copy() for wid, state in states.items()
+        }
+
+        # totaux Decimal (une passe engine) -> floats pour compat dashboard
+        equity_f, realized_f, gross_f, fees_f = map(_safe_float, self._engine.totals())
 
         snapshot: Dict[str, Any] = {
-            "updated_at": _now_iso(),
+            # stamp=False : horodaté seulement au moment d'écrire
+            "updated_at": _now_iso() if stamp else None,
             "wallets_source": "runtime_manager",
             "wallets": wallets,
             "wallets_count": len(wallets),
             # equity & PnL top-level (floats pour compat dashboard)
-            "equity_total_usd": _safe_float(equity_total),
-            "pnl_total_usd": _safe_float(gross_total),
-            "pnl_today_total_usd": _safe_float(gross_total),
+            "equity_total_usd": equity_f,
+            "pnl_total_usd": gross_f,
+            "pnl_today_total_usd": gross_f,
             "pnl_day": {
-                "total_realized_usd": _safe_float(realized_total),
-                "total_fees_usd": _safe_float(fees_total),
+                "total_realized_usd": realized_f,
+                "total_fees_usd": fees_f,
             },
         }
 
@@ -331,7 +565,7 @@ class RuntimeWalletManager:
 
         return snapshot
 
-    def _build_snapshot(self) -> Dict[str, Any]:
+    def _build_snapshot(self, *, stamp: bool = True) -> Dict[str, Any]:
         """Construit le snapshot complet (engine ou fallback)."""
         if self._engine is None:
             # Mode dégradé : on réutilise le fichier existant si possible,
@@ -339,19 +573,40 @@ class RuntimeWalletManager:
             path = RUNTIME_WALLETS_PATH
             base: Dict[str, Any] = {}
 
-            if path.exists():
-                try:
-                    base = json.loads(path.read_text(encoding="utf-8"))
-                except Exception:
-                    base = {}
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
 
-            if not isinstance(base, dict):
-                base = {}
+            if mtime_ns is not None:
+                cache = self._fallback_cache
+                if cache is not None and cache[0] == mtime_ns:
+                    base = cache[1]
+                else:
+                    try:
+                        base = json.loads(path.read_bytes())
+                    except Exception:
+                        base = {}
+                    if isinstance(base, dict):
+                        self._fallback_cache = (mtime_ns, base)
+
+            # copie : le cache ne doit pas être modifié par les setdefault
+            base = dict(base) if isinstance(base, dict) else {}
 
             base.setdefault("wallets", {})
             base.setdefault("wallets_count", len(base.get("wallets") or {}))
-            base["updated_at"] = _now_iso()
-            base.setdefault("equity_total_usd", 0.0)
+            base["updated_at"] = _now_iso() if stamp else None
+            # agrégats top-level : recalculés depuis les wallets seulement
+            # si le fichier ne les contient pas (format legacy)
+            wallets = base.get("wallets")
+            if "equity_total_usd" not in base:
+                base["equity_total_usd"] = _safe_float(
+                    _sum_wallets_field(wallets, "balance_usd", legacy_scalar=True)
+                )
+            if "pnl_today_total_usd" not in base:
+                base["pnl_today_total_usd"] = _safe_float(
+                    _sum_wallets_field(wallets, "gross_pnl_today_usd")
+                )
             base.setdefault("pnl_total_usd", 0.0)
             base.setdefault(
                 "pnl_day",
@@ -364,33 +619,87 @@ class RuntimeWalletManager:
             base.setdefault("wallets_source", "runtime_manager_stub")
             return base
 
-        return self._build_snapshot_from_engine()
+        return self._build_snapshot_from_engine(stamp=stamp)
+
+    def flush(self) -> None:
+        """
+        Écrit immédiatement le snapshot en attente (arrêt / fin de run).
+        En mode async, attend que le writer partagé ait tout écrit.
+
+        Appelé aussi automatiquement à la sortie du process si un état reste
+        non écrit (voir _flush_managers_at_exit).
+        """
+        with self._engine_lock:
+            self._dirty = False
+            self._last_flush_ts = time.monotonic()
+            self._write_snapshot()
+        if self._async_writes:
+            _WRITER.wait_idle()
+
+    def _maybe_flush(self) -> None:
+        """
+        Chemin tick / trade : construit et soumet le snapshot si l'intervalle
+        est écoulé, SANS attendre le writer (seul flush() bloque).
+        """
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if now - self._last_flush_ts >= self._snapshot_interval_s:
+            self._dirty = False
+            self._last_flush_ts = now
+            self._write_snapshot()
 
     def _write_snapshot(self) -> None:
         """Écrit le snapshot courant dans wallets_runtime.json (écriture safe)."""
-        snapshot = self._build_snapshot()
+        engine = self._engine
+        gen = engine.generation if engine is not None else None
+        if gen is not None and gen == self._last_gen and self._last_snapshot:
+            # aucun état modifié depuis le dernier snapshot : rien à faire
+            return
+
+        snapshot = self._build_snapshot(stamp=False)
         self._last_snapshot = snapshot
 
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        h = _snapshot_digest(snapshot)
+        if h == self._last_hash:
+            # contenu identique : on garde l'horodatage de la dernière écriture
+            snapshot["updated_at"] = self._last_updated_at
+            self._last_gen = gen
+        else:
+            snapshot["updated_at"] = self._last_updated_at = _now_iso()
+            if self._async_writes:
+                _WRITER.submit(_FINAL_PATH, self, snapshot, h, gen)
+            else:
+                self._write_file(snapshot, h, gen)
 
-        tmp_path = RUNTIME_WALLETS_PATH.with_suffix(
-            RUNTIME_WALLETS_PATH.suffix + ".tmp"
-        )
-        tmp_path.write_text(
-            json.dumps(
-                snapshot,
-                ensure_ascii=False,
-                indent=2,
-                default=str,
-            ),
-            encoding="utf-8",
-        )
-        tmp_path.replace(RUNTIME_WALLETS_PATH)
+    def _write_file(
+        self,
+        snapshot: Dict[str, Any],
+        h: bytes,
+        gen: Optional[int] = None,
+    ) -> None:
+        payload = _dumps_snapshot(snapshot)
+        try:
+            f = open(_TMP_PATH, "wb")
+        except FileNotFoundError:
+            # dossier supprimé depuis l'init : on le recrée une fois
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            f = open(_TMP_PATH, "wb")
+        with f:
+            f.write(payload)
+            if self._durable_snapshots:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(_TMP_PATH, _FINAL_PATH)
+        # mémorisés seulement après succès : un échec sera retenté au
+        # prochain appel, même sans nouvelle mutation de l'engine
+        self._last_hash = h
+        self._last_gen = gen
 
         self._logger.debug(
             "RuntimeWalletManager: snapshot écrit dans %s (wallets=%d, "
             "equity=%.2f, pnl=%.2f).",
-            str(RUNTIME_WALLETS_PATH),
+            _FINAL_PATH,
             snapshot.get("wallets_count"),
             snapshot.get("equity_total_usd"),
             snapshot.get("pnl_today_total_usd"),